@@ -0,0 +1,165 @@
+import argparse
+from datetime import timedelta
+
+import pandas as pd
+
+from paper_trader import PaperTrader, CHECK_INTERVAL, TRADE_LOG_HEADER
+from price_feed import ReplaySource
+from ledger import MemoryLedger
+from history_store import load_history
+from bar_store import BarStore, interval_length
+
+# --- CONFIGURATION ---
+BACKTEST_LOG_FILE = "backtest_trade_log.csv"   # Same columns as trade_log.csv
+BAR_INTERVAL = "1m"
+END_PADDING_MINUTES = 120   # Keep managing open positions this long after the last signal
+
+class SimClock:
+    """A clock the backtest moves by hand. Called like datetime.now."""
+    def __init__(self, start):
+        self.now = pd.Timestamp(start).to_pydatetime()
+
+    def __call__(self):
+        return self.now
+
+    def set(self, moment):
+        self.now = pd.Timestamp(moment).to_pydatetime()
+
+def load_signals(start=None, end=None):
+    """The BUY/SELL rows from the signal history, oldest first."""
+    df = load_history('signals', start=start, end=end)
+    if df.empty:
+        return df
+    df['Timestamp'] = pd.to_datetime(df['Timestamp'])
+    df = df[df['Signal'].astype(str).str.contains('BUY|SELL')]
+    return df.sort_values('Timestamp', kind='stable').reset_index(drop=True)
+
+def stamp_at_close(bars, interval=BAR_INTERVAL):
+    """
+    Bars come labelled by their start, but the close is only known when the
+    bar ends. Re-stamping them at start + interval means a replayed quote is
+    never a bar that is still forming at the simulated time.
+    """
+    return bars.assign(Timestamp=pd.to_datetime(bars['Timestamp']) + interval_length(interval))
+
+def load_bars(tickers, path=None, interval=BAR_INTERVAL):
+    """
+    Minute bars from a CSV (Timestamp, Ticker, Close; start-labelled like Yahoo's)
+    or the local bar store, stamped at their close. Never downloads.
+    """
+    if path:
+        bars = pd.read_csv(path, parse_dates=['Timestamp'])
+    else:
+        bars = BarStore().get_bars(tickers, interval, refresh=False)
+    return stamp_at_close(bars, interval)
+
+def run_backtest(signals, bars, exit_rules=None, config=None, check_interval=CHECK_INTERVAL, verbose=False):
+    """
+    Replays the signals through a PaperTrader on a simulated clock.
+    Same loop as PaperTrader.run(): each signal is traded when it arrives, and
+    exits are checked every check_interval seconds while anything is open
+    (idle stretches are skipped). Prices are the last bar close at or before
+    the simulated time. Positions still open at the end are closed as
+    CLOSE_BACKTEST_END. Returns the trade log as a DataFrame (trade_log.csv
+    columns) and the trader.
+    bars is a DataFrame (Timestamp, Ticker, Close) or ready-made
+    {ticker: (times, closes)} arrays, either way stamped at bar close
+    (load_bars / stamp_at_close).
+    With a config (an in-memory ConfigManager), signals whose |Score| is under
+    its current buy threshold are skipped, so the adaptive threshold shapes the
+    run the way it would have live. The config starts from whatever thresholds
+    it holds (ConfigManager(config_file=None) means the defaults, sweep.py seeds
+    it from trading_config.json). Signals the live threshold rejected were never
+    recorded, so a looser start can't bring them back.
+    """
+    if signals.empty:
+        return pd.DataFrame(columns=TRADE_LOG_HEADER), None
+
+    clock = SimClock(signals['Timestamp'].iloc[0])
+    ledger = MemoryLedger(TRADE_LOG_HEADER)
+    if isinstance(bars, dict):
+        source = ReplaySource.from_series(bars, clock=clock)
+    else:
+        source = ReplaySource(bars, clock=clock)
+    trader = PaperTrader(price_source=source, clock=clock, ledger=ledger,
+                         config=config, exit_rules=exit_rules, verbose=verbose)
+    step = timedelta(seconds=check_interval)
+
+    def tick_until(moment, next_tick):
+        while trader.positions and next_tick <= moment:
+            clock.now = next_tick   # Already a datetime: skip set()'s conversion
+            trader.check_exits()
+            next_tick += step
+        return next_tick
+
+    next_tick = clock()
+    for row in signals.to_dict('records'):
+        moment = row['Timestamp'].to_pydatetime()
+        next_tick = tick_until(moment, next_tick)
+        clock.set(moment)
+        if not trader.positions or next_tick < moment:
+            next_tick = moment + step   # Nothing was open: the tick schedule restarts here
+        if config is not None and abs(float(row['Score'])) < config.get_thresholds()[0]:
+            continue
+        trader.execute_trade(row)
+
+    # Let the last positions play out, then mark whatever is left to market
+    end = clock() + timedelta(minutes=END_PADDING_MINUTES)
+    tick_until(end, next_tick)
+    if trader.positions:
+        last_bar = source.last_time()
+        clock.set(min(end, last_bar) if last_bar is not None else end)
+        quotes = trader.prices.snapshot(list(trader.positions))
+        for ticker in list(trader.positions):
+            if quotes.get(ticker):
+                trader.close_position(ticker, quotes[ticker], "BACKTEST_END")
+
+    return pd.DataFrame(ledger.rows, columns=TRADE_LOG_HEADER), trader
+
+def summarize(trade_log):
+    """Closed-trade stats for a backtest's trade log."""
+    from metrics_engine import calculate_sharpe
+
+    closed = trade_log[trade_log['Action'].astype(str).str.startswith('CLOSE')]
+    if closed.empty:
+        return {'trades': 0, 'pnl': 0.0, 'win_rate': 0.0, 'sharpe': 0.0}
+    return {
+        'trades': len(closed),
+        'pnl': float(closed['PnL_Realized'].sum()),
+        'win_rate': float((closed['PnL_Realized'] > 0).mean()),
+        'sharpe': float(calculate_sharpe(closed.copy())),  # calculate_sharpe edits its input
+    }
+
+if __name__ == "__main__":
+    import time
+
+    parser = argparse.ArgumentParser(description="Replay sentiment_signals.csv against local minute bars.")
+    parser.add_argument("--start", help="First day to replay (YYYY-MM-DD)")
+    parser.add_argument("--end", help="Last day to replay (YYYY-MM-DD)")
+    parser.add_argument("--bars", help="CSV of bars (Timestamp, Ticker, Close); default is the bar store")
+    parser.add_argument("--out", default=BACKTEST_LOG_FILE)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    end = pd.Timestamp(args.end) + pd.Timedelta(days=1) if args.end else None
+    signals = load_signals(args.start, end)
+    if signals.empty:
+        print("No signals to replay. Run main.py first!")
+    else:
+        bars = load_bars(signals['Ticker'].unique(), args.bars)
+        started = time.time()
+        trade_log, _ = run_backtest(signals, bars, verbose=args.verbose)
+        elapsed = time.time() - started
+
+        trade_log.to_csv(args.out, index=False)
+        stats = summarize(trade_log)
+        print("\n" + "="*40)
+        print("   BACKTEST RESULTS")
+        print("="*40)
+        print(f"Signals Replayed: {len(signals)} in {elapsed:.2f}s")
+        print(f"Closed Trades:    {stats['trades']}")
+        print(f"Total PnL:        ${stats['pnl']:,.2f}")
+        print(f"Win Rate:         {stats['win_rate']*100:.1f}%")
+        print(f"Sharpe Ratio:     {stats['sharpe']:.2f} (Annualized)")
+        print(f"Trade log:        {args.out}")
+        print("="*40)
@@ -0,0 +1,154 @@
+import os
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401  (pandas' Parquet engine)
+    BAR_FORMAT = "parquet"
+except ImportError:  # No pyarrow: same layout, CSV files
+    BAR_FORMAT = "csv"
+
+# --- CONFIGURATION ---
+BAR_DIR = "bars"                     # bars/<interval>/<TICKER>.parquet
+BAR_COLUMNS = ['Timestamp', 'Open', 'High', 'Low', 'Close', 'Volume']
+DEFAULT_INTERVAL = "1m"
+
+# How far back Yahoo serves each bar size, and how much of it per request (days)
+MAX_LOOKBACK_DAYS = {'1m': 29, '2m': 59, '5m': 59, '15m': 59, '30m': 59, '60m': 729, '1h': 729, '1d': None}
+CHUNK_DAYS = {'1m': 7}
+
+def interval_length(interval):
+    """'1m' -> 1 minute, '1h' -> 1 hour, '1d' -> 1 day (Yahoo interval strings)."""
+    units = {'m': 'minutes', 'h': 'hours', 'd': 'days'}
+    return pd.Timedelta(**{units[interval[-1]]: int(interval[:-1])})
+
+class YFinanceBars:
+    """Bar source: Yahoo intraday bars, exchange time, timezone dropped (same as the rest of the repo)."""
+    def fetch(self, ticker, interval, start):
+        import yfinance as yf
+
+        end = datetime.now() + timedelta(days=1)
+        chunk = timedelta(days=CHUNK_DAYS.get(interval, 10000))
+        frames = []
+        while start < end:
+            data = yf.download(ticker, start=start, end=min(start + chunk, end),
+                               interval=interval, progress=False)
+            start += chunk
+            if data is None or data.empty:
+                continue
+            if isinstance(data.columns, pd.MultiIndex):  # Newer yfinance: (field, ticker)
+                data.columns = data.columns.get_level_values(0)
+            index = data.index.tz_localize(None) if data.index.tz is not None else data.index
+            data = data.reset_index(drop=True)
+            data.insert(0, 'Timestamp', index)
+            frames.append(data[[c for c in BAR_COLUMNS if c in data.columns]])
+        if not frames:
+            return pd.DataFrame(columns=BAR_COLUMNS)
+        return pd.concat(frames, ignore_index=True)
+
+class BarStore:
+    """
+    Local OHLCV cache, one file per ticker and interval.
+    update() only asks the source for bars after the last one on disk (the last
+    bar is re-fetched, it may have still been forming), so repeat runs cost one
+    small request per ticker and history keeps growing past Yahoo's lookback.
+    Reads never touch the network unless asked to refresh.
+    """
+    def __init__(self, root=BAR_DIR, source=None):
+        self.root = root
+        self.source = source or YFinanceBars()
+
+    def path(self, ticker, interval=DEFAULT_INTERVAL):
+        ticker = str(ticker).replace('$', '')
+        return os.path.join(self.root, interval, f"{ticker}.{BAR_FORMAT}")
+
+    def _read(self, path):
+        if not os.path.exists(path):
+            return pd.DataFrame(columns=BAR_COLUMNS)
+        if BAR_FORMAT == "parquet":
+            return pd.read_parquet(path)
+        return pd.read_csv(path, parse_dates=['Timestamp'])
+
+    def _write(self, path, df):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        if BAR_FORMAT == "parquet":
+            df.to_parquet(tmp_path, index=False)
+        else:
+            df.to_csv(tmp_path, index=False)
+        os.replace(tmp_path, path)
+
+    def load(self, ticker, interval=DEFAULT_INTERVAL, start=None, end=None):
+        """Stored bars for one ticker (Timestamp + OHLCV), oldest first."""
+        df = self._read(self.path(ticker, interval))
+        if start is not None:
+            df = df[df['Timestamp'] >= pd.Timestamp(start)]
+        if end is not None:
+            df = df[df['Timestamp'] <= pd.Timestamp(end)]
+        return df.reset_index(drop=True)
+
+    def last_timestamp(self, ticker, interval=DEFAULT_INTERVAL):
+        df = self._read(self.path(ticker, interval))
+        return None if df.empty else pd.Timestamp(df['Timestamp'].max())
+
+    def update(self, ticker, interval=DEFAULT_INTERVAL):
+        """Fetches the missing tail for one ticker. Returns the number of new bars."""
+        ticker = str(ticker).replace('$', '')
+        path = self.path(ticker, interval)
+        stored = self._read(path)
+
+        lookback = MAX_LOOKBACK_DAYS.get(interval)
+        oldest_allowed = datetime.now() - timedelta(days=lookback) if lookback else datetime(1990, 1, 1)
+        if stored.empty:
+            start = oldest_allowed
+        else:
+            start = pd.Timestamp(stored['Timestamp'].max()).to_pydatetime()
+            if start < oldest_allowed:
+                print(f"   [Bars] {ticker} {interval}: gap from {start:%Y-%m-%d} (older than Yahoo keeps).")
+                start = oldest_allowed
+
+        fresh = self.source.fetch(ticker, interval, start)
+        if fresh.empty:
+            return 0
+        fresh = fresh.dropna(subset=['Close'])
+        fresh['Timestamp'] = pd.to_datetime(fresh['Timestamp']).astype('datetime64[ns]')
+
+        # Append-only, except the overlap (the old last bar may have been incomplete)
+        cutoff = fresh['Timestamp'].min()
+        kept = stored[stored['Timestamp'] < cutoff] if not stored.empty else stored
+        merged = pd.concat([kept, fresh], ignore_index=True) if not kept.empty else fresh
+        merged = (merged.drop_duplicates('Timestamp', keep='last')
+                        .sort_values('Timestamp').reset_index(drop=True))
+        self._write(path, merged[[c for c in BAR_COLUMNS if c in merged.columns]])
+        return len(merged) - len(stored)
+
+    def get_bars(self, tickers, interval=DEFAULT_INTERVAL, start=None, end=None, refresh=True):
+        """
+        Bars for several tickers stacked (Timestamp, Ticker, OHLCV).
+        refresh=False (or no network) just serves what's on disk.
+        """
+        frames = []
+        for ticker in dict.fromkeys(str(t).replace('$', '') for t in tickers):
+            if refresh:
+                try:
+                    added = self.update(ticker, interval)
+                    print(f"   [Bars] {ticker} {interval}: +{added} bars")
+                except Exception as e:
+                    print(f"   [Bars] Could not update {ticker} (using stored bars): {e}")
+            df = self.load(ticker, interval, start, end)
+            if not df.empty:
+                frames.append(df.assign(Ticker=ticker))
+        if not frames:
+            return pd.DataFrame(columns=['Timestamp', 'Ticker'] + BAR_COLUMNS[1:])
+        return pd.concat(frames, ignore_index=True)
+
+# Run this file directly (e.g. from cron) to top up bars for every ticker we've signalled on
+if __name__ == "__main__":
+    from history_store import load_history
+
+    signals = load_history('signals', columns=['Ticker'])
+    if signals.empty:
+        print("No signals yet. Run main.py first!")
+    else:
+        BarStore().get_bars(signals['Ticker'].unique())
@@ -1,106 +1,256 @@
 import json
 import os
-import pandas as pd
+import tempfile
+from collections import deque
+from threading import Lock
+from history_store import load_history
 
 # --- CONSTANTS ---
 CONFIG_FILE = "trading_config.json"
 TRADE_LOG = "trade_log.csv"
+WIN_RATE_WINDOW = 10      # Analyze the last 10 trades (Short-term memory)
+MIN_TRADES_TO_LEARN = 5   # We need at least 5 trades to start learning
 
 # Default settings (Neutral Stance)
 DEFAULT_CONFIG = {
     "buy_threshold": 0.5,
     "sell_threshold": 0.5,
     "max_position_size": 100000,
-    "mode": "NEUTRAL"  # Can be AGGRESSIVE, NEUTRAL, or DEFENSIVE
+    "mode": "NEUTRAL",  # Can be AGGRESSIVE, NEUTRAL, or DEFENSIVE
+    "sentiment_backend": "torch",  # torch (fp32), int8, or onnx
+    "version": 0  # Bumped on every save, so both processes can tell which thresholds they run
 }
 
+# The reward / punishment rules (tunable, see sweep.py)
+LEARNING_RULES = {
+    "reward_win_rate": 0.70,    # At or above: loosen the threshold
+    "punish_win_rate": 0.40,    # At or below: tighten it
+    "reward_multiplier": 0.98,  # Lower by 2%...
+    "punish_multiplier": 1.05,  # Raise by 5%...
+    "buy_floor": 0.35,          # ...but never below this
+    "buy_cap": 0.85,            # ...or above this
+}
+
+def read_setting(key, default=None, config_file=CONFIG_FILE):
+    """
+    One value straight from the JSON, for code that only needs a setting:
+    no ConfigManager, so no config file gets created and no trade history is read.
+    """
+    try:
+        with open(config_file, 'r') as f:
+            return json.load(f).get(key, default)
+    except (OSError, ValueError, AttributeError):
+        return default
+
+class RollingWinRate:
+    """
+    Win rate over the last N closed trades, updated in O(1) per trade.
+    Fed each closed trade's PnL directly, so nobody has to re-read the trade log.
+    """
+    def __init__(self, window=WIN_RATE_WINDOW):
+        self.results = deque(maxlen=window)  # 1 = win, 0 = loss
+        self.wins = 0
+
+    def add(self, pnl):
+        if len(self.results) == self.results.maxlen:
+            self.wins -= self.results[0]  # This one is about to fall out of the window
+        win = 1 if pnl > 0 else 0
+        self.results.append(win)
+        self.wins += win
+
+    def __len__(self):
+        return len(self.results)
+
+    @property
+    def win_rate(self):
+        return self.wins / len(self.results) if self.results else 0.0
+
 class ConfigManager:
-    def __init__(self):
+    """
+    Shared view of trading_config.json.
+    Every read checks the file's mtime (one stat call) and reloads if another
+    process wrote it, and every write goes temp-file -> rename, so a reader never
+    sees half-written JSON.
+    config_file=None keeps everything in memory and starts from the defaults
+    with no trade history (backtests).
+    """
+    def __init__(self, config_file=CONFIG_FILE, learning_rules=None, verbose=True):
+        self.config_file = config_file
+        self.rules = dict(LEARNING_RULES, **(learning_rules or {}))
+        self.verbose = verbose
+        self.file_signature = None  # (mtime_ns, size) of the version we last loaded
+        self._lock = Lock()
         self.config = self.load_config()
+        self.win_tracker = self.seed_win_tracker() if config_file else RollingWinRate()
+
+    def seed_win_tracker(self):
+        """One read of past closed trades at startup; after that it's fed trade by trade."""
+        tracker = RollingWinRate()
+        try:
+            df = load_history('trades', columns=['Action', 'PnL_Realized'])
+            if not df.empty:
+                closed_trades = df[df['Action'].astype(str).str.contains('CLOSE')]
+                for pnl in closed_trades['PnL_Realized'].tail(WIN_RATE_WINDOW):
+                    tracker.add(float(pnl))
+        except Exception as e:
+            print(f"   [Config Error] Could not read past trades: {e}")
+        return tracker
+
+    def _signature(self):
+        try:
+            stat = os.stat(self.config_file)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
 
     def load_config(self):
         """Loads the JSON config or creates a default one if missing."""
-        if not os.path.exists(CONFIG_FILE):
-            print(f"   [Config] No config found. Creating default {CONFIG_FILE}...")
-            self.save_config(DEFAULT_CONFIG)
-            return DEFAULT_CONFIG
+        if self.config_file is None:
+            return dict(DEFAULT_CONFIG)
+        if not os.path.exists(self.config_file):
+            print(f"   [Config] No config found. Creating default {self.config_file}...")
+            self.save_config(dict(DEFAULT_CONFIG))
+            return self.config
         
         try:
-            with open(CONFIG_FILE, 'r') as f:
-                return json.load(f)
+            signature = self._signature()
+            with open(self.config_file, 'r') as f:
+                config = json.load(f)
+            self.file_signature = signature
+            return config
         except Exception:
-            return DEFAULT_CONFIG
+            return dict(DEFAULT_CONFIG)
+
+    def refresh(self):
+        """
+        Hot reload: picks up changes written by the other process.
+        Returns True if a new version was loaded.
+        """
+        if self.config_file is None:
+            return False
+        signature = self._signature()
+        if signature is None or signature == self.file_signature:
+            return False
+
+        with self._lock:
+            try:
+                with open(self.config_file, 'r') as f:
+                    config = json.load(f)
+            except Exception:
+                return False  # Keep running on the version we have
+            self.config = config
+            self.file_signature = signature
+        return True
+
+    @property
+    def version(self):
+        return self.config.get("version", 0)
 
     def save_config(self, new_config):
-        """Saves the updated settings to JSON."""
-        with open(CONFIG_FILE, 'w') as f:
-            json.dump(new_config, f, indent=4)
-        self.config = new_config
+        """Saves the updated settings to JSON (atomically, with a new version number)."""
+        with self._lock:
+            new_config = dict(new_config)
+            new_config["version"] = max(self.version if hasattr(self, 'config') else 0,
+                                        new_config.get("version", 0)) + 1
+
+            if self.config_file is None:
+                self.config = new_config
+                return
+
+            folder = os.path.dirname(os.path.abspath(self.config_file))
+            fd, tmp_path = tempfile.mkstemp(prefix=".trading_config.", suffix=".tmp", dir=folder)
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(new_config, f, indent=4)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.config_file)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+            self.config = new_config
+            self.file_signature = self._signature()
 
     def get_thresholds(self):
-        """Returns the current dynamic thresholds."""
+        """Returns the current dynamic thresholds (reloading first if the file changed)."""
+        self.refresh()
         return self.config.get("buy_threshold", 0.5), self.config.get("sell_threshold", 0.5)
 
-    def update_dynamic_thresholds(self):
+    def update_dynamic_thresholds(self, pnl=None):
         """
         THE REWARD / PUNISHMENT ENGINE
-        Reads the trade log, calculates Win Rate, and adjusts thresholds.
+        Records the closed trade's PnL (if given), checks the rolling Win Rate,
+        and adjusts thresholds. The config file is only rewritten if they change.
         """
-        if not os.path.exists(TRADE_LOG):
-            return
-
         try:
-            df = pd.read_csv(TRADE_LOG)
-            
-            # Filter for Closed Trades only
-            closed_trades = df[df['Action'].str.contains('CLOSE')]
-            
+            if pnl is not None:
+                self.win_tracker.add(float(pnl))
+
+            # Build on the latest thresholds on disk, not a stale copy
+            self.refresh()
+
             # We need at least 5 trades to start learning
-            if len(closed_trades) < 5:
+            if len(self.win_tracker) < MIN_TRADES_TO_LEARN:
                 return
 
-            # Analyze the last 10 trades (Short-term memory)
-            recent_trades = closed_trades.tail(10)
-            
-            # Calculate Win Rate
-            wins = len(recent_trades[recent_trades['PnL_Realized'] > 0])
-            total = len(recent_trades)
-            win_rate = wins / total if total > 0 else 0.0
+            # Calculate Win Rate (last WIN_RATE_WINDOW trades)
+            win_rate = self.win_tracker.win_rate
             
             current_buy = self.config.get("buy_threshold", 0.5)
+            rules = self.rules
             
             # --- LOGIC GATES ---
             
             # SCENARIO 1: REWARD (Hot Streak)
             # If we are winning > 70% of trades, the bot is too picky.
             # We lower the threshold to let more trades in.
-            if win_rate >= 0.70:
-                new_buy = max(0.35, current_buy * 0.98) # Lower by 2%, floor at 0.35
+            if win_rate >= rules["reward_win_rate"]:
+                new_buy = max(rules["buy_floor"], current_buy * rules["reward_multiplier"]) # Default: lower by 2%, floor at 0.35
                 mode = "AGGRESSIVE"
-                print(f"   [Learning] Win Rate is {win_rate*100:.0f}%. REWARDING system. (Thresh: {new_buy:.3f})")
+                if self.verbose:
+                    print(f"   [Learning] Win Rate is {win_rate*100:.0f}%. REWARDING system. (Thresh: {new_buy:.3f})")
 
             # SCENARIO 2: PUNISHMENT (Cold Streak)
             # If we are winning < 40%, the signals are garbage.
             # We raise the threshold to filter out noise.
-            elif win_rate <= 0.40:
-                new_buy = min(0.85, current_buy * 1.05) # Raise by 5%, cap at 0.85
+            elif win_rate <= rules["punish_win_rate"]:
+                new_buy = min(rules["buy_cap"], current_buy * rules["punish_multiplier"]) # Default: raise by 5%, cap at 0.85
                 mode = "DEFENSIVE"
-                print(f"   [Learning] Win Rate is {win_rate*100:.0f}%. PUNISHING system. (Thresh: {new_buy:.3f})")
+                if self.verbose:
+                    print(f"   [Learning] Win Rate is {win_rate*100:.0f}%. PUNISHING system. (Thresh: {new_buy:.3f})")
 
             # SCENARIO 3: NEUTRAL (Stability)
             else:
                 new_buy = current_buy
                 mode = "NEUTRAL"
             
-            # Save Logic
-            self.config["buy_threshold"] = round(new_buy, 3)
-            self.config["sell_threshold"] = round(new_buy, 3) # Symmetric for now
-            self.config["mode"] = mode
+            # Save Logic (skip the disk write if nothing moved)
+            new_values = {
+                "buy_threshold": round(new_buy, 3),
+                "sell_threshold": round(new_buy, 3), # Symmetric for now
+                "mode": mode,
+            }
+            if all(self.config.get(key) == value for key, value in new_values.items()):
+                return
+            self.config.update(new_values)
             self.save_config(self.config)
 
         except Exception as e:
             print(f"   [Config Error] Could not update thresholds: {e}")
 
+# --- SHARED INSTANCE (one per process) ---
+_shared_config = None
+_shared_config_lock = Lock()
+
+def shared_config():
+    global _shared_config
+    with _shared_config_lock:
+        if _shared_config is None:
+            _shared_config = ConfigManager()
+    return _shared_config
+
 # Test code to run if you execute this file directly
 if __name__ == "__main__":
     cm = ConfigManager()
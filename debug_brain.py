@@ -1,4 +1,4 @@
-from news_scraper import get_sentiment, nlp_social
+from news_scraper import get_sentiment, models
 
 print("--- DEBUGGING SOCIAL BRAIN ---")
 
@@ -6,7 +6,9 @@ print("--- DEBUGGING SOCIAL BRAIN ---")
 text = "Tesla is going to the moon! 🚀 Buying more $TSLA"
 
 # 1. Get Raw Output
-raw_result = nlp_social(text)
+load_times = models.warm_up('social')
+print(f"Model load time: {load_times['social']:.1f}s")
+raw_result = models.get('social')(text)
 print(f"Raw Model Output: {raw_result}")
 
 # 2. Check how our function interprets it
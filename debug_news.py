@@ -1,5 +1,5 @@
 import pandas as pd
-from news_scraper import get_finviz_news, get_sentiment
+from news_scraper import get_finviz_news, get_sentiment_batch
 
 print("--- NEWS BRAIN AUDIT ---")
 ticker = "TSLA"
@@ -8,14 +8,15 @@ ticker = "TSLA"
 print(f"Scraping {ticker}...")
 df = get_finviz_news(ticker)
 
-# 2. Score them one by one
+# 2. Score them in one batch
+headlines = df['Headline'].head(15).tolist()
+# Use the News Brain (ProsusAI)
+scores = get_sentiment_batch(headlines, source_type='news')
+
 print(f"\n{'SENTIMENT':<10} | {'SCORE':<6} | HEADLINE")
 print("-" * 80)
 
-for headline in df['Headline'].head(15):
-    # Use the News Brain (ProsusAI)
-    score = get_sentiment(headline, source_type='news')
-    
+for headline, score in zip(headlines, scores):
     # Visual Label
     if score > 0.1: label = "BULLISH"
     elif score < -0.1: label = "BEARISH"
@@ -0,0 +1,100 @@
+import hashlib
+import json
+import os
+import re
+import time
+from collections import OrderedDict
+
+# --- CONFIGURATION ---
+DEDUP_FILE = "seen_tweets.json"
+MAX_ENTRIES = 50000          # Oldest keys are dropped past this (RAM Protection)
+TTL_HOURS = 24               # A tweet older than this can count as new again
+
+URL_PATTERN = re.compile(r'https?://\S+')
+RETWEET_PREFIX = re.compile(r'^rt @\w+:?\s*')
+
+def fingerprint(text):
+    """
+    Normalized text hash: case, links, 'RT @user:' and spacing don't matter,
+    so retweets and lightly edited copies collapse to the same key.
+    """
+    text = str(text).lower()
+    text = RETWEET_PREFIX.sub('', text)
+    text = URL_PATTERN.sub('', text)
+    text = " ".join(text.split())
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:16]
+
+class TweetDedupStore:
+    """
+    O(1) 'have we seen this tweet?' check.
+    Keys are the tweet ID and the text fingerprint; a tweet is a repeat if
+    either was seen before. Keys expire after TTL_HOURS or once MAX_ENTRIES
+    is reached (FIFO), and can be saved to disk to survive restarts.
+    """
+    def __init__(self, path=DEDUP_FILE, max_entries=MAX_ENTRIES, ttl_hours=TTL_HOURS):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl_hours * 3600
+        self.keys = OrderedDict()  # key -> first seen (epoch), oldest first
+        self.checked = 0
+        self.duplicates = 0
+        if path:
+            self.load()
+
+    def _expire(self, now):
+        while self.keys:
+            key, first_seen = next(iter(self.keys.items()))
+            if now - first_seen <= self.ttl and len(self.keys) <= self.max_entries:
+                break
+            self.keys.popitem(last=False)
+
+    def is_new(self, text, tweet_id=None):
+        """Returns True (and remembers it) the first time a tweet shows up."""
+        now = time.time()
+        self._expire(now)
+        self.checked += 1
+
+        keys = [f"fp:{fingerprint(text)}"]
+        if tweet_id:
+            keys.append(f"id:{tweet_id}")
+
+        if any(key in self.keys for key in keys):
+            self.duplicates += 1
+            return False
+
+        for key in keys:
+            self.keys[key] = now
+        self._expire(now)
+        return True
+
+    def stats(self):
+        return {
+            'checked': self.checked,
+            'duplicates': self.duplicates,
+            'dedup_rate': self.duplicates / self.checked if self.checked > 0 else 0.0,
+            'entries': len(self.keys),
+        }
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r') as f:
+                entries = json.load(f)
+            self.keys = OrderedDict(sorted(((k, float(t)) for k, t in entries), key=lambda item: item[1]))
+            self._expire(time.time())
+            print(f"   [Dedup] Restored {len(self.keys)} seen-tweet keys from {self.path}")
+        except Exception as e:
+            print(f"   [Dedup] Could not read {self.path} ({e}). Starting fresh.")
+            self.keys = OrderedDict()
+
+    def save(self):
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(list(self.keys.items()), f)
+            os.replace(tmp_path, self.path)
+        except IOError as e:
+            print(f"   [Dedup] Could not save {self.path}: {e}")
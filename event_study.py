@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+
+# --- CONFIGURATION ---
+HORIZONS_MIN = (1, 5, 10, 30, 60)   # Forward-return horizons, in minutes
+ENTRY_TOLERANCE_MIN = 10            # Entry bar must be at most this old at signal time
+EXIT_TOLERANCE_MIN = 15             # Exit bar may be at most this late (gaps, overnight)
+DEFAULT_BAR_MINUTES = 1             # Used when the bar size can't be inferred
+
+def signal_direction(signals):
+    """+1 for BUY signals, -1 for SELL, 0 for anything else."""
+    text = signals.astype(str).str.upper()
+    return np.where(text.str.contains('BUY'), 1, np.where(text.str.contains('SELL'), -1, 0))
+
+def _prepare_bars(bars):
+    bars = bars[['Timestamp', 'Ticker', 'Close']].dropna()
+    bars = bars.assign(Timestamp=pd.to_datetime(bars['Timestamp']).astype('datetime64[ns]'),
+                       Ticker=bars['Ticker'].astype(str).str.replace('$', '', regex=False))
+    return bars.sort_values('Timestamp', kind='stable').reset_index(drop=True)
+
+def infer_bar_length(bars):
+    """Most common gap between consecutive bars of the same ticker (the bar size)."""
+    gaps = bars.sort_values(['Ticker', 'Timestamp'])
+    gaps = gaps.groupby('Ticker')['Timestamp'].diff().dropna()
+    gaps = gaps[gaps > pd.Timedelta(0)]
+    if gaps.empty:
+        return pd.Timedelta(minutes=DEFAULT_BAR_MINUTES)
+    return gaps.mode().iloc[0]
+
+def forward_returns(signals, bars, horizons=HORIZONS_MIN, bar_length=None,
+                    entry_tolerance_min=ENTRY_TOLERANCE_MIN, exit_tolerance_min=EXIT_TOLERANCE_MIN):
+    """
+    Lines every signal up with the price bars in one pass per horizon (merge_asof by ticker).
+    signals: Timestamp, Ticker, Signal, Score
+    bars:    Timestamp, Ticker, Close (any bar size, all tickers stacked)
+    Bars are labelled by their start (Yahoo's convention), but a close only
+    exists once the bar ends, so everything is matched on start + bar_length
+    (inferred from the bars if not given). Entry is the last close printed at
+    or before the signal (no peeking); the exit for horizon h is the first
+    close printed at or after signal + h. Adds Entry_Price, Direction and
+    Ret_<h>m (in %, NaN where there is no usable bar).
+    """
+    events = signals[['Timestamp', 'Ticker', 'Signal', 'Score']].copy()
+    events['Timestamp'] = pd.to_datetime(events['Timestamp']).astype('datetime64[ns]')
+    events['Ticker'] = events['Ticker'].astype(str).str.replace('$', '', regex=False)
+    events['Score'] = pd.to_numeric(events['Score'], errors='coerce')
+    events = events.dropna(subset=['Timestamp']).sort_values('Timestamp', kind='stable').reset_index(drop=True)
+    events['Direction'] = signal_direction(events['Signal'])
+
+    bars = _prepare_bars(bars)
+    if bar_length is None:
+        bar_length = infer_bar_length(bars)
+    right = bars.assign(Bar_Time=bars['Timestamp'] + pd.Timedelta(bar_length))[['Bar_Time', 'Ticker', 'Close']]
+
+    # 1. ENTRY: last bar that had closed by the signal
+    entry = pd.merge_asof(events[['Timestamp', 'Ticker']], right,
+                          left_on='Timestamp', right_on='Bar_Time', by='Ticker',
+                          direction='backward', tolerance=pd.Timedelta(minutes=entry_tolerance_min))
+    events['Entry_Price'] = entry['Close'].to_numpy()
+    entry_price = events['Entry_Price'].to_numpy()
+
+    # 2. EXITS: first bar closing at or after signal + h (the target times stay sorted)
+    for h in horizons:
+        targets = pd.DataFrame({'Target': events['Timestamp'] + pd.Timedelta(minutes=h),
+                                'Ticker': events['Ticker']})
+        exit_ = pd.merge_asof(targets, right, left_on='Target', right_on='Bar_Time', by='Ticker',
+                              direction='forward', tolerance=pd.Timedelta(minutes=exit_tolerance_min))
+        events[f'Ret_{h}m'] = (exit_['Close'].to_numpy() - entry_price) / entry_price * 100
+
+    return events
+
+def summarize(events, by='Ticker', horizons=HORIZONS_MIN):
+    """
+    Per group (ticker, signal type, ...): signal count, hit rate (price moved the
+    way the signal pointed) and information coefficient (Spearman rank
+    correlation of Score vs forward return) at every horizon.
+    """
+    by = [by] if isinstance(by, str) else list(by)
+    groups = events.groupby(by, sort=True)
+    summary = pd.DataFrame({'N': groups.size()})
+
+    for h in horizons:
+        col = f'Ret_{h}m'
+        ret = events[col]
+        usable = ret.notna() & (events['Direction'] != 0)
+        hit = (np.sign(ret) == events['Direction']).astype(float).where(usable)
+        summary[f'Hit_{h}m'] = hit.groupby([events[k] for k in by]).mean()
+
+        # Spearman = Pearson on ranks, ranked within each group
+        pairs = events[by + ['Score']].assign(Ret=ret).dropna()
+        ranks = pairs.groupby(by)[['Score', 'Ret']].rank()
+        ranks[by] = pairs[by]
+        summary[f'IC_{h}m'] = ranks.groupby(by)[['Score', 'Ret']].apply(
+            lambda g: g['Score'].corr(g['Ret']) if len(g) > 2 else np.nan)
+
+    return summary
+
+def run_event_study(signals, bars, horizons=HORIZONS_MIN, bar_length=None):
+    """Forward returns plus the per-ticker and per-signal-type tables."""
+    events = forward_returns(signals, bars, horizons, bar_length)
+    return events, summarize(events, 'Ticker', horizons), summarize(events, 'Signal', horizons)
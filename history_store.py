@@ -0,0 +1,339 @@
+import io
+import os
+import shutil
+import time
+import uuid
+from datetime import datetime
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # No pyarrow: everything falls back to the CSV files
+    pa = None
+
+# --- CONFIGURATION ---
+HISTORY_DIR = "history"
+HISTORY_FLUSH_SECONDS = 60   # The ledger mirror buffers rows this long before writing a part file
+MAX_PARTS_PER_DAY = 24       # Today's partition gets compacted once it has more part files than this
+CSV_TAIL_BYTES = 1 << 20     # Backfill reads the CSV's tail in windows this big (growing 4x as needed)
+
+# dataset -> (source CSV, numeric columns)
+DATASETS = {
+    'signals': ("sentiment_signals.csv", ['Score', 'News_Score', 'Diversity']),
+    'trades': ("trade_log.csv", ['Price', 'Shares', 'PnL_Realized']),
+}
+
+# Partition key: one directory per trading day (history/<dataset>/date=YYYY-MM-DD/)
+PARTITIONING = None if pa is None else ds.partitioning(pa.schema([('date', pa.string())]), flavor='hive')
+
+def dataset_path(dataset, root=HISTORY_DIR):
+    return os.path.join(root, dataset)
+
+def has_parquet(dataset, root=HISTORY_DIR):
+    return pa is not None and os.path.isdir(dataset_path(dataset, root))
+
+def _prepare(dataset, df):
+    """Fixes column types (so every part file has the same schema) and adds the partition key."""
+    df = df.copy()
+    df['Timestamp'] = pd.to_datetime(df['Timestamp'], errors='coerce').astype('datetime64[ns]')
+    df = df.dropna(subset=['Timestamp'])
+    df['Ticker'] = df['Ticker'].astype(str)
+    for col in DATASETS[dataset][1]:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype('float64')
+    for col in df.columns:
+        if df[col].dtype == object:
+            df[col] = df[col].astype(str)
+    df['date'] = df['Timestamp'].dt.strftime('%Y-%m-%d')
+    return df
+
+# Readers skip names starting with '.', so every file is written under a hidden
+# name and renamed into place: a scan never sees a half-written part file.
+def write_frame(dataset, df, root=HISTORY_DIR):
+    """Appends rows as new Parquet part files, one per day touched. Returns the days touched."""
+    if pa is None or df.empty:
+        return set()
+    df = _prepare(dataset, df)
+    if df.empty:
+        return set()
+    name = f"part-{uuid.uuid4().hex}.parquet"
+    for date, rows in df.groupby('date', sort=True):
+        part_dir = _partition_dir(dataset, date, root)
+        os.makedirs(part_dir, exist_ok=True)
+        tmp = os.path.join(part_dir, f".{name}.tmp")
+        pq.write_table(pa.Table.from_pandas(rows.drop(columns=['date']), preserve_index=False), tmp)
+        os.replace(tmp, os.path.join(part_dir, name))
+    return set(df['date'])
+
+def _partition_dir(dataset, date, root=HISTORY_DIR):
+    return os.path.join(dataset_path(dataset, root), f"date={date}")
+
+def part_count(dataset, date, root=HISTORY_DIR):
+    part_dir = _partition_dir(dataset, date, root)
+    if not os.path.isdir(part_dir):
+        return 0
+    return sum(1 for f in os.listdir(part_dir) if f.endswith('.parquet'))
+
+class HistorySink:
+    """
+    Ledger mirror: the rows the CSV writer flushes also land in Parquet.
+    Rows are buffered and written at most every flush_seconds (and on close),
+    and partitions are compacted as they go: a past day as soon as it's
+    written to (day rollover, late rows), today once it passes max_parts files.
+    So each day ends up as one file, and today never has more than max_parts.
+    """
+    def __init__(self, dataset, root=HISTORY_DIR, flush_seconds=HISTORY_FLUSH_SECONDS,
+                 max_parts=MAX_PARTS_PER_DAY, clock=time.time):
+        self.dataset = dataset
+        self.root = root
+        self.flush_seconds = flush_seconds
+        self.max_parts = max_parts
+        self.clock = clock
+        self.header = None
+        self.pending = []
+        self.last_flush = clock()
+
+    def __call__(self, header, rows):
+        self.header = header
+        self.pending.extend(rows)
+        self.poll()
+
+    def poll(self):
+        """Writes the buffer if it's due (the ledger calls this on every loop, even idle ones)."""
+        if self.pending and self.clock() - self.last_flush >= self.flush_seconds:
+            self.flush()
+
+    def flush(self):
+        rows, self.pending = self.pending, []
+        self.last_flush = self.clock()
+        if not rows:
+            return
+        days = write_frame(self.dataset, pd.DataFrame(rows, columns=self.header), self.root)
+
+        today = datetime.now().strftime('%Y-%m-%d')
+        for day in sorted(days):
+            if day != today or part_count(self.dataset, day, self.root) > self.max_parts:
+                compact(self.dataset, self.root, dates=[day])
+
+    def close(self):
+        self.flush()
+        compact(self.dataset, self.root, dates=[datetime.now().strftime('%Y-%m-%d')])
+
+def attach_history(ledger, dataset, root=HISTORY_DIR):
+    """
+    Mirrors a ledger into the Parquet store. The first time, the existing CSV is
+    migrated so the Parquet copy starts complete; after that, whatever the last
+    run wrote to the CSV but never got to Parquet is backfilled (a kill or crash
+    skips HistorySink.close()). No-op without pyarrow.
+    """
+    if pa is None:
+        return
+    if not has_parquet(dataset, root):
+        migrate_csv(dataset, root)
+    else:
+        _recover(dataset_path(dataset, root))
+        if getattr(ledger, 'path', None):
+            backfill_csv(dataset, ledger.path, root)
+    ledger.add_mirror(HistorySink(dataset, root))
+
+def _ticker_forms(tickers):
+    """'TSLA' and '$TSLA' both match, whichever way the log stored it."""
+    forms = set()
+    for t in tickers:
+        bare = str(t).replace('$', '')
+        forms.update({bare, f"${bare}"})
+    return sorted(forms)
+
+def load_history(dataset, tickers=None, start=None, end=None, columns=None, root=HISTORY_DIR):
+    """
+    Reads signals or trades as a DataFrame.
+    From Parquet, the date range prunes whole day-partitions and the ticker/time
+    filters are pushed down into the scan. Without Parquet (or pyarrow) it reads
+    the CSV and filters in pandas. Returns an empty frame if there's no data.
+    """
+    start = pd.Timestamp(start) if start is not None else None
+    end = pd.Timestamp(end) if end is not None else None
+
+    if has_parquet(dataset, root):
+        data = ds.dataset(dataset_path(dataset, root), format='parquet', partitioning=PARTITIONING)
+        expr = None
+        conditions = []
+        if start is not None:
+            conditions += [ds.field('date') >= start.strftime('%Y-%m-%d'),
+                           ds.field('Timestamp') >= pa.scalar(start.to_datetime64())]
+        if end is not None:
+            conditions += [ds.field('date') <= end.strftime('%Y-%m-%d'),
+                           ds.field('Timestamp') <= pa.scalar(end.to_datetime64())]
+        if tickers:
+            conditions.append(ds.field('Ticker').isin(_ticker_forms(tickers)))
+        for condition in conditions:
+            expr = condition if expr is None else expr & condition
+
+        wanted = None if columns is None else list(dict.fromkeys(['Timestamp'] + list(columns)))
+        try:
+            df = data.to_table(columns=wanted, filter=expr).to_pandas()
+        except FileNotFoundError:
+            # A partition was compacted between listing and reading: list again
+            data = ds.dataset(dataset_path(dataset, root), format='parquet', partitioning=PARTITIONING)
+            df = data.to_table(columns=wanted, filter=expr).to_pandas()
+        df = df.drop(columns=['date'], errors='ignore')
+        return df.sort_values('Timestamp', kind='stable').reset_index(drop=True)
+
+    csv_path = DATASETS[dataset][0]
+    if not os.path.exists(csv_path):
+        return pd.DataFrame()
+    df = pd.read_csv(csv_path, usecols=None if columns is None else lambda c: c in set(columns) | {'Timestamp', 'Ticker'})
+    if start is not None or end is not None:
+        stamps = pd.to_datetime(df['Timestamp'], errors='coerce')
+        if start is not None:
+            df = df[stamps >= start]
+        if end is not None:
+            df = df[stamps <= end]
+    if tickers:
+        df = df[df['Ticker'].isin(_ticker_forms(tickers))]
+    if columns is not None:
+        df = df[[c for c in ['Timestamp'] + list(columns) if c in df.columns]]
+    return df.reset_index(drop=True)
+
+def _recover(base):
+    """
+    Finishes or undoes a compaction that died halfway (see compact).
+    A .new is only complete once its .old exists (the old parts are moved
+    aside after the merged file is written), so then the merged file goes in,
+    next to any rows written since. Anything else left over is removed.
+    """
+    hidden = set(os.listdir(base))
+    for name in sorted(hidden):
+        if not (name.startswith('.date=') and name.endswith('.new')):
+            continue
+        part = name[1:-len('.new')]
+        new_dir, part_dir = os.path.join(base, name), os.path.join(base, part)
+        if f".{part}.old" in hidden:
+            if not os.path.exists(part_dir):
+                os.rename(new_dir, part_dir)
+            else:
+                for f in os.listdir(new_dir):
+                    os.replace(os.path.join(new_dir, f), os.path.join(part_dir, f))
+        shutil.rmtree(new_dir, ignore_errors=True)
+    for name in hidden:
+        if name.startswith('.date=') and name.endswith('.old'):
+            shutil.rmtree(os.path.join(base, name), ignore_errors=True)
+
+def compact(dataset, root=HISTORY_DIR, dates=None):
+    """
+    Rewrites each day-partition (or just the given dates) as a single file
+    (the ledger mirror writes several small ones per day).
+    The merged file goes into a hidden sibling directory that is then swapped
+    in with two renames, so a reader sees the old parts or the merged file,
+    never both (the day is only missing for the instant between the renames).
+    """
+    if not has_parquet(dataset, root):
+        return
+    base = dataset_path(dataset, root)
+    _recover(base)
+    parts = sorted(os.listdir(base)) if dates is None else [f"date={d}" for d in dates]
+    for part in parts:
+        part_dir = os.path.join(base, part)
+        if part.startswith('.') or not os.path.isdir(part_dir):
+            continue
+        files = [f for f in os.listdir(part_dir) if f.endswith('.parquet') and not f.startswith('.')]
+        if len(files) < 2:
+            continue
+        table = pq.read_table([os.path.join(part_dir, f) for f in files])
+        if 'date' in table.column_names:   # Inferred from the directory name; it stays in the path only
+            table = table.drop(['date'])
+
+        new_dir = os.path.join(base, f".{part}.new")
+        old_dir = os.path.join(base, f".{part}.old")
+        os.makedirs(new_dir)
+        pq.write_table(table, os.path.join(new_dir, f"part-{uuid.uuid4().hex}.parquet"))
+        os.rename(part_dir, old_dir)
+        os.rename(new_dir, part_dir)
+        shutil.rmtree(old_dir)
+
+def migrate_csv(dataset, root=HISTORY_DIR, chunksize=100000):
+    """One-time import of the existing CSV into the partitioned Parquet store."""
+    if pa is None:
+        print("   [History] pyarrow is not installed. Staying on CSV.")
+        return 0
+    if has_parquet(dataset, root):
+        print(f"   [History] {dataset_path(dataset, root)} already exists. Skipping.")
+        return 0
+    csv_path = DATASETS[dataset][0]
+    if not os.path.exists(csv_path):
+        return 0
+
+    total = 0
+    for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+        write_frame(dataset, chunk, root)
+        total += len(chunk)
+    compact(dataset, root)
+    print(f"   [History] Migrated {total} rows from {csv_path} -> {dataset_path(dataset, root)}")
+    return total
+
+def _high_water_mark(dataset, root=HISTORY_DIR):
+    """Newest Timestamp in the Parquet copy and how many rows carry it ((None, 0) if empty)."""
+    base = dataset_path(dataset, root)
+    for part in sorted((p for p in os.listdir(base) if p.startswith('date=')), reverse=True):
+        part_dir = os.path.join(base, part)
+        files = [os.path.join(part_dir, f) for f in os.listdir(part_dir)
+                 if f.endswith('.parquet') and not f.startswith('.')]
+        if not files:
+            continue
+        stamps = pq.read_table(files, columns=['Timestamp']).column('Timestamp').to_pandas()
+        if not stamps.empty:
+            newest = stamps.max()
+            return newest, int((stamps == newest).sum())
+    return None, 0
+
+def _csv_rows_since(path, since, window=CSV_TAIL_BYTES):
+    """
+    CSV rows stamped at or after `since` (the file is in time order), reading
+    only as much of its tail as that takes. Returns (rows, their timestamps).
+    """
+    with open(path, 'rb') as f:
+        header = f.readline()
+        size = os.fstat(f.fileno()).st_size
+        while True:
+            start = max(len(header), size - window)
+            f.seek(start - 1)
+            data = f.read()
+            data = data[data.find(b"\n") + 1:]   # Drop the line the window cut into (if any)
+            df = pd.read_csv(io.BytesIO(header + data))
+            stamps = pd.to_datetime(df['Timestamp'], errors='coerce')
+            if start == len(header) or stamps.min() < since:
+                keep = (stamps >= since).to_numpy()
+                return df[keep], stamps[keep]
+            window *= 4
+
+def backfill_csv(dataset, csv_path=None, root=HISTORY_DIR):
+    """
+    Copies the CSV rows the Parquet store never got: everything after its
+    newest row, plus any extra rows sharing that row's timestamp.
+    Returns the number of rows added.
+    """
+    csv_path = csv_path or DATASETS[dataset][0]
+    if not has_parquet(dataset, root) or not os.path.exists(csv_path):
+        return 0
+    newest, stored = _high_water_mark(dataset, root)
+    if newest is None:
+        newest = pd.Timestamp.min
+    rows, stamps = _csv_rows_since(csv_path, newest)
+    ties = (stamps == newest).to_numpy()
+    missing = rows[~ties | (ties.cumsum() > stored)]
+    if missing.empty:
+        return 0
+
+    days = write_frame(dataset, missing, root)
+    today = datetime.now().strftime('%Y-%m-%d')
+    compact(dataset, root, dates=[d for d in days if d != today])
+    print(f"   [History] Backfilled {len(missing)} rows from {csv_path} that never reached Parquet")
+    return len(missing)
+
+# Run this file directly to migrate the existing CSV logs
+if __name__ == "__main__":
+    for name in DATASETS:
+        migrate_csv(name)
@@ -0,0 +1,45 @@
+import random
+import time
+from threading import Lock
+from urllib.parse import urlparse
+
+# --- POLITENESS DEFAULTS (seconds between requests to the same host) ---
+DEFAULT_MIN_DELAY = 3.0
+DEFAULT_JITTER = 4.0   # Random extra wait so we don't hit on a fixed beat
+
+def host_of(url_or_host):
+    """'https://finviz.com/quote.ashx?t=X' -> 'finviz.com'"""
+    if "://" in url_or_host:
+        return urlparse(url_or_host).netloc.lower()
+    return url_or_host.lower()
+
+class HostThrottle:
+    """
+    Per-host politeness delay.
+    Every caller reserves the next free slot for its host, so requests to the
+    same site stay spaced out (and look human) while different sites run in parallel.
+    """
+    def __init__(self, min_delay=DEFAULT_MIN_DELAY, jitter=DEFAULT_JITTER, per_host=None):
+        self.min_delay = min_delay
+        self.jitter = jitter
+        self.per_host = per_host or {}   # host -> (min_delay, jitter) overrides
+        self.next_slot = {}              # host -> earliest time the next request may go
+        self._lock = Lock()
+
+    def reserve(self, url_or_host):
+        """Books the next slot for this host and returns how long to wait for it."""
+        host = host_of(url_or_host)
+        min_delay, jitter = self.per_host.get(host, (self.min_delay, self.jitter))
+
+        with self._lock:
+            now = time.time()
+            slot = max(now, self.next_slot.get(host, now))
+            self.next_slot[host] = slot + min_delay + random.uniform(0, jitter)
+        return slot - now
+
+    def wait(self, url_or_host):
+        """Blocks until this host's slot comes up. Returns the seconds waited."""
+        delay = self.reserve(url_or_host)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
@@ -0,0 +1,212 @@
+import hashlib
+import json
+import os
+import random
+import time
+from threading import Lock
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from host_throttle import HostThrottle
+
+# --- CONFIGURATION ---
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+    "Accept-Language": "en-US,en;q=0.9",
+    "Accept-Encoding": "gzip, deflate",
+}
+POOL_SIZE = 10                  # Keep-alive connections per host
+REQUEST_TIMEOUT = 15            # Seconds
+MAX_RETRIES = 4
+BACKOFF_BASE = 1.0              # Seconds; doubles per attempt, with full jitter
+BACKOFF_CAP = 30.0
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+HTTP_CACHE_DIR = "http_cache"   # Last good body + ETag/Last-Modified per URL
+
+# Per-host politeness (min gap, random jitter) in seconds
+HOST_DELAYS = {
+    'finviz.com': (1.0, 1.0),
+    'finance.yahoo.com': (1.0, 1.0),
+}
+
+# Offline benchmarking:
+#   HTTP_RECORD_DIR=fixtures python main.py   -> saves every page fetched
+#   HTTP_REPLAY_DIR=fixtures python debug_news.py -> serves them, no network at all
+RECORD_DIR = os.environ.get("HTTP_RECORD_DIR")
+REPLAY_DIR = os.environ.get("HTTP_REPLAY_DIR")
+
+def url_key(url):
+    return hashlib.sha1(url.encode('utf-8')).hexdigest()
+
+class HttpResponse:
+    """Just the parts of requests.Response the scrapers use, plus cache flags."""
+    def __init__(self, url, status_code, text, headers=None, from_cache=False, not_modified=False):
+        self.url = url
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers or {}
+        self.from_cache = from_cache      # Body came from our cache (304 or replay)
+        self.not_modified = not_modified  # Server said 304: page unchanged since last fetch
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error for url: {self.url}")
+
+class HttpClient:
+    """
+    Shared HTTP layer for the Finviz/Yahoo scrapers:
+    pooled keep-alive session, per-host rate limit, retries with jittered
+    backoff on 429/5xx, conditional GETs (ETag/Last-Modified) against a local
+    response cache, and a record/replay mode for offline runs.
+    """
+    def __init__(self, throttle=None, cache_dir=HTTP_CACHE_DIR, record_dir=RECORD_DIR, replay_dir=REPLAY_DIR):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update(DEFAULT_HEADERS)
+
+        self.throttle = throttle or HostThrottle(min_delay=0.0, jitter=0.0, per_host=HOST_DELAYS)
+        self.cache_dir = cache_dir
+        self.record_dir = record_dir
+        self.replay_dir = replay_dir
+        self.memory = {}  # url -> cache entry
+        self._lock = Lock()
+
+        self.requests_sent = 0
+        self.not_modified = 0
+        self.retries = 0
+
+        for folder in (cache_dir, record_dir):
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+
+    # --- LOCAL RESPONSE CACHE ---
+    def _cache_path(self, folder, url):
+        return os.path.join(folder, f"{url_key(url)}.json")
+
+    def _load_entry(self, folder, url):
+        path = self._cache_path(folder, url)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (IOError, ValueError):
+            return None
+
+    def _save_entry(self, folder, url, entry):
+        path = self._cache_path(folder, url)
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, path)
+        except IOError as e:
+            print(f"   [HTTP] Could not cache {url}: {e}")
+
+    def _cached(self, url):
+        with self._lock:
+            entry = self.memory.get(url)
+        if entry is None and self.cache_dir:
+            entry = self._load_entry(self.cache_dir, url)
+            if entry:
+                with self._lock:
+                    self.memory[url] = entry
+        return entry
+
+    # --- FETCH ---
+    def _backoff(self, attempt, response=None):
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(BACKOFF_CAP, float(retry_after))
+        return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * (2 ** attempt)))
+
+    def get(self, url, headers=None, max_age=0):
+        """
+        GET with all the politeness and caching applied.
+        max_age > 0 serves a cached copy younger than that many seconds without asking the server.
+        """
+        # REPLAY MODE: recorded page or nothing, never the network
+        if self.replay_dir:
+            entry = self._load_entry(self.replay_dir, url)
+            if entry is None:
+                return HttpResponse(url, 404, "", from_cache=True)
+            return HttpResponse(url, entry['status'], entry['text'], entry.get('headers'), from_cache=True)
+
+        entry = self._cached(url)
+        if entry and max_age and time.time() - entry['fetched_at'] < max_age:
+            return HttpResponse(url, entry['status'], entry['text'], entry.get('headers'), from_cache=True)
+
+        request_headers = dict(headers or {})
+        if entry:
+            if entry.get('etag'):
+                request_headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                request_headers['If-Modified-Since'] = entry['last_modified']
+
+        response = None
+        for attempt in range(MAX_RETRIES + 1):
+            self.throttle.wait(url)
+            try:
+                response = self.session.get(url, headers=request_headers, timeout=REQUEST_TIMEOUT)
+                self.requests_sent += 1
+            except requests.RequestException:
+                if attempt == MAX_RETRIES:
+                    raise
+                self.retries += 1
+                time.sleep(self._backoff(attempt))
+                continue
+
+            if response.status_code in RETRY_STATUSES and attempt < MAX_RETRIES:
+                self.retries += 1
+                time.sleep(self._backoff(attempt, response))
+                continue
+            break
+
+        # 304: unchanged since last time, reuse the cached body
+        if response.status_code == 304 and entry:
+            self.not_modified += 1
+            entry['fetched_at'] = time.time()
+            return HttpResponse(url, entry['status'], entry['text'], entry.get('headers'),
+                                from_cache=True, not_modified=True)
+
+        result = HttpResponse(url, response.status_code, response.text, dict(response.headers))
+
+        if response.status_code == 200:
+            new_entry = {
+                'url': url,
+                'status': 200,
+                'text': response.text,
+                'headers': {k: v for k, v in response.headers.items() if k.lower() == 'content-type'},
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'fetched_at': time.time(),
+            }
+            with self._lock:
+                self.memory[url] = new_entry
+            if self.cache_dir and (new_entry['etag'] or new_entry['last_modified']):
+                self._save_entry(self.cache_dir, url, new_entry)
+            if self.record_dir:
+                self._save_entry(self.record_dir, url, new_entry)
+
+        return result
+
+    def stats(self):
+        return {
+            'requests_sent': self.requests_sent,
+            'not_modified': self.not_modified,
+            'retries': self.retries,
+        }
+
+# Shared instance (one connection pool per process)
+_shared_client = None
+_shared_client_lock = Lock()
+
+def get_client():
+    global _shared_client
+    with _shared_client_lock:
+        if _shared_client is None:
+            _shared_client = HttpClient()
+    return _shared_client
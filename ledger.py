@@ -0,0 +1,203 @@
+import atexit
+import csv
+import os
+import queue
+import threading
+import time
+
+# --- CONFIGURATION ---
+# Durability modes:
+#   'event'    -> flush + fsync after every row (safest, slowest)
+#   'interval' -> flush + fsync at most every FLUSH_INTERVAL_MS
+#   'shutdown' -> only guaranteed on close() (fastest)
+DURABILITY_MODE = 'interval'
+FLUSH_INTERVAL_MS = 250
+MAX_QUEUE = 10000   # Back-pressure: append() only blocks if the disk falls this far behind
+APPEND_TIMEOUT = 5.0   # While blocked, append() re-checks the writer thread is still alive this often
+
+_STOP = object()
+
+class LedgerWriter:
+    """
+    Append-only CSV ledger written by a background thread.
+    append() just queues the row, so trading never waits on the disk.
+    The file is opened once, the header is written only if it's new, and
+    rows are written in batches according to the durability mode.
+    If the thread is gone (crashed, or the ledger was closed), append() writes
+    the row itself, synchronously, so rows are never queued to nobody.
+    """
+    def __init__(self, path, header, durability=DURABILITY_MODE,
+                 flush_interval_ms=FLUSH_INTERVAL_MS, max_queue=MAX_QUEUE):
+        self.path = path
+        self.header = header
+        self.durability = durability
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.rows = queue.Queue(maxsize=max_queue)
+        self.written = 0
+        # Extra sinks, called as sink(header, rows) after each written batch.
+        # Optional sink.poll() runs on every writer loop and sink.close() when the ledger closes.
+        self.mirrors = []
+        self._direct_lock = threading.Lock()
+
+        self.thread = threading.Thread(target=self._run, name=f"ledger:{path}", daemon=True)
+        self.thread.start()
+
+    def append(self, row):
+        row = list(row)
+        while self.thread.is_alive():
+            try:
+                self.rows.put(row, timeout=APPEND_TIMEOUT)
+                return
+            except queue.Full:
+                print(f"   [Ledger] {self.path} is {self.rows.maxsize} rows behind. Waiting for the disk...")
+        self._write_direct([row])
+
+    def _write_direct(self, rows):
+        """
+        Fallback without the thread: whatever it left queued, then rows, fsync'd.
+        Mirrors are closed after each write too, nothing is left to poll them.
+        """
+        with self._direct_lock:
+            batch = []
+            while True:
+                try:
+                    batch.append(self.rows.get_nowait())
+                except queue.Empty:
+                    break
+            batch = [r for r in batch if r is not _STOP] + rows
+            if not batch:
+                return
+            try:
+                is_new = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+                with open(self.path, 'a', newline='') as f:
+                    writer = csv.writer(f)
+                    if is_new:
+                        writer.writerow(self.header)
+                    writer.writerows(batch)
+                    self._sync(f)
+                self.written += len(batch)
+            except Exception as e:
+                print(f"   [ERROR] Could not write to {self.path}: {e}")
+                return
+            self._mirror(batch, stopping=True)
+
+    def add_mirror(self, sink):
+        self.mirrors.append(sink)
+
+    def _sync(self, f):
+        f.flush()
+        os.fsync(f.fileno())
+
+    def _mirror(self, batch, stopping=False):
+        for sink in self.mirrors:
+            try:
+                if batch:
+                    sink(self.header, batch)
+                elif hasattr(sink, 'poll'):
+                    sink.poll()
+                if stopping and hasattr(sink, 'close'):
+                    sink.close()
+            except Exception as e:
+                print(f"   [ERROR] Ledger mirror failed for {self.path}: {e}")
+
+    def _run(self):
+        try:
+            self._write_loop()
+        except Exception as e:
+            print(f"   [ERROR] Ledger writer for {self.path} stopped: {e}. Writing directly from now on.")
+
+    def _write_loop(self):
+        is_new = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        with open(self.path, 'a', newline='') as f:
+            writer = csv.writer(f)
+            if is_new:
+                writer.writerow(self.header)
+                self._sync(f)
+
+            last_sync = time.time()
+            dirty = False   # Rows written since the last fsync
+            stopping = False
+            while not stopping:
+                try:
+                    batch = [self.rows.get(timeout=self.flush_interval)]
+                except queue.Empty:
+                    batch = []
+
+                # Grab everything else that is already waiting
+                while True:
+                    try:
+                        batch.append(self.rows.get_nowait())
+                    except queue.Empty:
+                        break
+
+                if _STOP in batch:
+                    stopping = True
+                    batch = [row for row in batch if row is not _STOP]
+
+                try:
+                    for row in batch:
+                        writer.writerow(row)
+                        if self.durability == 'event':
+                            self._sync(f)
+                    self.written += len(batch)
+                    dirty = dirty or (bool(batch) and self.durability != 'event')
+
+                    if stopping or (self.durability == 'interval' and dirty
+                                    and time.time() - last_sync >= self.flush_interval):
+                        self._sync(f)
+                        last_sync = time.time()
+                        dirty = False
+                except Exception as e:
+                    print(f"   [ERROR] Could not write to {self.path}: {e}")
+
+                self._mirror(batch, stopping)
+
+    def close(self, timeout=10.0):
+        """Drains every queued row to disk (fsync'd) and stops the thread."""
+        if self.thread.is_alive():
+            self.rows.put(_STOP)
+            self.thread.join(timeout)
+        if not self.thread.is_alive():
+            self._write_direct([])   # Rows queued while the thread was stopping
+
+class MemoryLedger:
+    """Same interface as LedgerWriter, but rows just go into a list (backtests)."""
+    def __init__(self, header):
+        self.header = header
+        self.rows = []
+        self.mirrors = []
+
+    @property
+    def written(self):
+        return len(self.rows)
+
+    def append(self, row):
+        row = list(row)
+        self.rows.append(row)
+        for sink in self.mirrors:
+            sink(self.header, [row])
+
+    def add_mirror(self, sink):
+        self.mirrors.append(sink)
+
+    def close(self, timeout=None):
+        pass
+
+# --- SHARED LEDGERS (one writer per file per process) ---
+_ledgers = {}
+_ledgers_lock = threading.Lock()
+
+def get_ledger(path, header):
+    with _ledgers_lock:
+        if path not in _ledgers:
+            _ledgers[path] = LedgerWriter(path, header)
+        return _ledgers[path]
+
+def close_all():
+    with _ledgers_lock:
+        ledgers = list(_ledgers.values())
+        _ledgers.clear()
+    for ledger in ledgers:
+        ledger.close()
+
+atexit.register(close_all)
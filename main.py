@@ -1,18 +1,23 @@
 import pandas as pd
 import time
-import csv
-import os
-import random
 from datetime import datetime
-from collections import deque 
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
 
 # --- IMPORT THE BRAIN & SENSORS ---
 try:
-    from news_scraper import get_finviz_news, calculate_metrics, get_sentiment
+    from news_scraper import get_finviz_news_since, mark_news_seen, score_news_records, composite_news_score, get_sentiment_batch
+    from model_registry import models
+    from sentiment_cache import get_shared_cache
     from market_scanner import get_market_movers  
     from scraper_engine import TwitterScraper
     # LINK THE DYNAMIC BRAIN
-    from config_manager import ConfigManager      
+    from config_manager import shared_config
+    from host_throttle import HostThrottle
+    from dedup_store import TweetDedupStore
+    from signal_bus import SignalPublisher
+    from ledger import get_ledger, close_all as close_ledgers
+    from history_store import attach_history
 except ImportError as e:
     print(f"CRITICAL ERROR: Missing module. {e}")
     exit()
@@ -21,36 +26,60 @@ except ImportError as e:
 CHECK_INTERVAL_SECONDS = 120  
 DIVERSITY_THRESHOLD = 0.7     
 LOG_FILE = "sentiment_signals.csv" 
+SIGNAL_CSV_AUDIT = True      # Also append every signal to LOG_FILE (the trader's fallback feed)
+SIGNAL_HEADER = ['Timestamp', 'Ticker', 'Signal', 'Score', 'News_Score', 'Diversity']
 REFRESH_TICKERS_CYCLES = 15  # Refresh hot list every ~30 mins
-BROWSER_RESTART_CYCLES = 20  # <--- MEMORY FIX: Reboot browser every ~40 mins
+NEWS_WORKERS = 8             # Finviz fetch + scoring runs on this many threads
+NEWS_MEMORY = 100            # Scored headlines kept per ticker (about one Finviz table)
+TWITTER_TABS = 4             # Twitter searches loading in parallel
+
+# --- STEALTH MODE (per-host politeness: min gap + random jitter, in seconds) ---
+# Replaces the old global 3-7s sleep per ticker: each site gets its own spacing,
+# so Finviz fetches and Twitter searches no longer wait on each other.
+# (Finviz/Yahoo spacing lives in http_client.HOST_DELAYS.)
+HOST_DELAYS = {
+    'twitter.com': (2.0, 3.0),
+}
+throttle = HostThrottle(per_host=HOST_DELAYS)
 
 # --- STATE MEMORY ---
-# Maxlen ensures we never store more than 2000 tweets (RAM Protection)
-seen_tweets = deque(maxlen=2000)
+# Keyed on tweet ID + text fingerprint, bounded by size and age (RAM Protection),
+# and saved to disk so a restart doesn't re-score and re-signal old tweets.
+seen_tweets = TweetDedupStore()
+
+# Scored Finviz headlines per ticker (newest first). Each cycle only the
+# headlines that appeared since the last one get parsed and scored.
+news_memory = {}
+news_memory_lock = Lock()
+
+# --- SIGNAL BUS (pushes signals straight to paper_trader.py) ---
+bus = SignalPublisher()
 
 def log_signal(ticker, signal_type, score, news_score, diversity):
-    file_exists = os.path.exists(LOG_FILE)
-    try:
-        with open(LOG_FILE, mode='a', newline='') as f:
-            writer = csv.writer(f)
-            if not file_exists:
-                writer.writerow(['Timestamp', 'Ticker', 'Signal', 'Score', 'News_Score', 'Diversity'])
-            writer.writerow([
-                datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                ticker, signal_type, score, news_score, diversity
-            ])
-        print(f"   [Data Logged to {LOG_FILE}]")
-    except IOError as e:
-        print(f"   [ERROR] Could not write to log file: {e}")
-
-def analyze_twitter_signal(scraper, ticker):
-    query = ticker if ticker.startswith('$') else f"${ticker}"
-    print(f"   > Scraping Twitter for {query}...")
-    
-    try:
-        raw_tweets = scraper.scrape_search(query, max_tweets=15)
-    except Exception as e:
-        print(f"   [WARN] Scraper failed for {query}: {e}")
+    signal = {
+        'Timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'Ticker': ticker, 'Signal': signal_type, 'Score': score,
+        'News_Score': news_score, 'Diversity': diversity,
+    }
+
+    # 1. Push to the trader first: this is the low-latency path
+    pushed = bus.publish(signal)   # Never raises: False if the trader can't be reached
+    if pushed:
+        print(f"   [Signal pushed to trader]")
+
+    # 2. Audit trail, and the fallback whenever the push didn't land
+    #    Queued for the background ledger writer, so this never waits on disk.
+    if pushed and not SIGNAL_CSV_AUDIT:
+        return
+    get_ledger(LOG_FILE, SIGNAL_HEADER).append([signal[col] for col in SIGNAL_HEADER])
+    print(f"   [Data Logged to {LOG_FILE}]")
+
+def twitter_query(ticker):
+    return ticker if ticker.startswith('$') else f"${ticker}"
+
+def analyze_twitter_signal(ticker, raw_tweets):
+    """Spam/dedup filter + Social Brain scoring for one ticker's scraped tweets."""
+    if raw_tweets is None:
         return 0, 0, "Scraper Error"
 
     if not raw_tweets:
@@ -59,13 +88,13 @@ def analyze_twitter_signal(scraper, ticker):
     new_tweets = []
     spam_keywords = ["discord.gg", "t.me/", "whatsapp", "join my group"]
 
-    for text in raw_tweets:
+    for tweet in raw_tweets:
+        text = tweet['text']
         if any(spam in text.lower() for spam in spam_keywords):
             continue    
 
-        if text not in seen_tweets:
+        if seen_tweets.is_new(text, tweet_id=tweet.get('id')):
             new_tweets.append(text)
-            seen_tweets.append(text) 
             
     if not new_tweets:
         return 0, 0, "No New Tweets"
@@ -75,48 +104,133 @@ def analyze_twitter_signal(scraper, ticker):
     unique_texts = len(set(new_tweets))
     diversity_score = unique_texts / total_new if total_new > 0 else 0
     
-    scores = [get_sentiment(t, source_type='social') for t in new_tweets]
+    scores = get_sentiment_batch(new_tweets, source_type='social')
     avg_sentiment = sum(scores) / len(scores) if scores else 0
     
     return diversity_score, avg_sentiment, f"{total_new} new tweets"
 
+def fetch_news_score(ticker):
+    """
+    Finviz fetch + News Brain scoring for one ticker.
+    Runs on the worker pool, so it overlaps with the Twitter scrape.
+    """
+    clean_ticker = ticker.replace('$', '')
+    try:
+        fresh, newest_key = get_finviz_news_since(clean_ticker)
+        # Raises on a model failure: nothing is stored and the headlines come back next cycle
+        fresh = score_news_records(fresh)
+        with news_memory_lock:
+            known = news_memory.get(clean_ticker, [])
+            # If the last-seen headline scrolled off the page, the whole table comes back
+            known_urls = {r['URL'] for r in known}
+            fresh = [r for r in fresh if r['URL'] not in known_urls]
+            records = (fresh + known)[:NEWS_MEMORY]
+            news_memory[clean_ticker] = records
+        mark_news_seen(clean_ticker, newest_key)
+        return composite_news_score(records)
+    except Exception as e:
+        print(f"   [WARN] News failed for {ticker}: {e}")
+        with news_memory_lock:
+            records = news_memory.get(clean_ticker, [])
+        return composite_news_score(records) if records else 0
+
+def decide_signal(ticker, news_score, social_score, diversity, BUY_THRESH):
+    """DECISION MATRIX (Dynamic Logic). Logs and returns the signal."""
+    sentiment_gap = social_score - news_score
+    print(f" > {ticker}: News({news_score:.2f}) | Social({social_score:.2f}) | Gap({sentiment_gap:.2f})")
+    
+    signal = "HOLD"
+
+    # --- SCENARIO 1: PURE ARBITRAGE (The Leak) ---
+    # Twitter knows something, News is silent.
+    if diversity > DIVERSITY_THRESHOLD and abs(news_score) < 0.2:
+        
+        # Case A: Bullish (Dynamic Threshold)
+        if social_score > BUY_THRESH:
+            signal = "BUY (Social-Arbitrage)"
+            print(f"   >>> SIGNAL: {signal}")
+            log_signal(ticker, signal, social_score, news_score, diversity)
+
+        # Case B: Bearish (Dynamic Threshold)
+        elif social_score < -BUY_THRESH:
+            signal = "SELL (Social-Arbitrage)"
+            print(f"   >>> SIGNAL: {signal}")
+            log_signal(ticker, signal, social_score, news_score, diversity)
+
+    # --- SCENARIO 2: THE REBELLION (The Conflict) ---
+    # News and Social are fighting. We bet on the Crowd.
+    
+    # Case A: News Good, Crowd Bad -> SHORT
+    elif news_score > BUY_THRESH and social_score < -BUY_THRESH:
+        signal = "SELL (Rebellion)"
+        print(f"   >>> SIGNAL: {signal} | Fading the News!")
+        log_signal(ticker, signal, social_score, news_score, diversity)
+
+    # Case B: News Bad, Crowd Good -> LONG
+    elif news_score < -BUY_THRESH and social_score > BUY_THRESH:
+        signal = "BUY (Rebellion)"
+        print(f"   >>> SIGNAL: {signal} | Buying the Fear!")
+        log_signal(ticker, signal, social_score, news_score, diversity)
+
+    # --- SCENARIO 3: NOISE / CONSENSUS ---
+    else:
+        if abs(social_score) > BUY_THRESH and abs(news_score) > BUY_THRESH:
+             print(f"   [Hold] Consensus (Priced In).")
+
+    return signal
+
 def main():
     print(f"--- STARTING ARBITRAGE ENGINE (V3.1 Memory Optimized) ---")
+
+    # --- WARM UP THE DUAL BRAINS ---
+    # Loaded here (not at import) so the first cycle doesn't pay for it.
+    print("--- Initializing The Twin Engines (This takes RAM!) ---")
+    try:
+        load_times = models.warm_up()
+        print(f"--- Dual Brains Ready [{models.backend}] (News {load_times['news']:.1f}s | Social {load_times['social']:.1f}s) ---")
+    except Exception as e:
+        print(f"CRITICAL ERROR loading models: {e}")
+        return
     
     try:
         print("Launching Headless Browser...")
-        scraper = TwitterScraper(headless=True)
+        scraper = TwitterScraper(headless=True, max_pages=TWITTER_TABS)
     except Exception as e:
         print(f"Error starting scraper: {e}")
         return
 
+    # --- SIGNAL HISTORY (day-partitioned Parquet copy of the CSV audit log) ---
+    if SIGNAL_CSV_AUDIT:
+        attach_history(get_ledger(LOG_FILE, SIGNAL_HEADER), 'signals')
+
     # --- INITIALIZE THE CONFIG MANAGER ---
-    cm = ConfigManager()
+    cm = shared_config()  # Hot-reloads trading_config.json when the trader rewrites it
     print(f"   [Config] Connected to Learning Engine.")
 
     tickers = ['$TSLA', '$NVDA', '$AMD'] 
     cycle_count = 0
+    news_pool = ThreadPoolExecutor(max_workers=NEWS_WORKERS, thread_name_prefix="news")
 
     try:
         while True:
             cycle_start_time = time.time()
             
-            # 1. MEMORY CLEANUP: RESTART BROWSER
-            # Headless Chrome leaks memory. We kill it and respawn it periodically.
-            if cycle_count > 0 and cycle_count % BROWSER_RESTART_CYCLES == 0:
-                print(f"\n[{datetime.now().strftime('%H:%M:%S')}] Maintenance: Restarting Browser to clear RAM...")
-                try:
-                    scraper.close()
-                    time.sleep(5) # Give OS time to reclaim memory
-                    scraper = TwitterScraper(headless=True)
-                    print("   [Success] Browser rebooted.")
-                except Exception as e:
-                    print(f"   [Error] Browser restart failed: {e}")
-                    # Try to continue even if restart failed, or re-raise if critical
+            # 1. MEMORY CLEANUP: RECYCLE BROWSER (only when it needs it)
+            # Headless Chrome leaks memory. The scraper watches Chromium's RSS and
+            # page errors, and swaps in a fresh context on the same browser process.
+            restart_downtime = 0.0
+            try:
+                maintenance = scraper.maybe_recycle()
+                if maintenance:
+                    restart_downtime = maintenance['downtime']
+                    print(f"\n[{datetime.now().strftime('%H:%M:%S')}] Maintenance: {maintenance['reason']} -> "
+                          f"{maintenance['action']} in {restart_downtime:.1f}s")
+            except Exception as e:
+                print(f"   [Error] Browser recycle failed: {e}")
 
             # 2. FETCH LATEST DYNAMIC THRESHOLDS
             BUY_THRESH, SELL_THRESH = cm.get_thresholds()
-            print(f"   [Config] Active Threshold: +/- {BUY_THRESH:.3f}")
+            print(f"   [Config] Active Threshold: +/- {BUY_THRESH:.3f} (v{cm.version})")
 
             # 3. REFRESH TICKERS periodically
             if cycle_count % REFRESH_TICKERS_CYCLES == 0:
@@ -131,67 +245,28 @@ def main():
 
             print(f"\n[{datetime.now().strftime('%H:%M:%S')}] Scanning Markets (Cycle {cycle_count})...")
             
-            for ticker in tickers:
-                # 4. STEALTH MODE (Random Sleep)
-                sleep_delay = random.uniform(3, 7)
-                print(f"   [Wait] Sleeping {sleep_delay:.1f}s to act human...")
-                time.sleep(sleep_delay)
+            # 4. PIPELINE: all news fetches go to the pool at once...
+            news_futures = {ticker: news_pool.submit(fetch_news_score, ticker) for ticker in tickers}
 
+            # ...while the Twitter searches load in parallel tabs (Playwright stays on this thread)
+            queries = [twitter_query(ticker) for ticker in tickers]
+            print(f"   > Scraping Twitter for {len(queries)} tickers...")
+            tweets_by_query = scraper.scrape_many(queries, max_tweets=15, throttle=throttle, records=True)
+            net = scraper.stats()
+            print(f"   [Network] Blocked {net['requests_blocked']} of {net['requests_blocked'] + net['requests_allowed']} requests "
+                  f"({net['blocked_share']*100:.0f}%) | {net['json_tweets']} tweets from API JSON "
+                  f"({net['json_tweets_per_sec']:,.0f}/s parse)")
+
+            for ticker, query in zip(tickers, queries):
                 try:
-                    clean_ticker = ticker.replace('$', '')
-                    
-                    # A. GET NEWS
-                    try:
-                        news_df = get_finviz_news(clean_ticker)
-                        _, news_score = calculate_metrics(news_df)
-                    except Exception as e:
-                        print(f"   [WARN] News failed for {ticker}: {e}")
-                        news_score = 0
-                    
-                    # B. GET TWITTER
-                    diversity, social_score, status = analyze_twitter_signal(scraper, ticker)
+                    # B. SCORE TWITTER
+                    diversity, social_score, status = analyze_twitter_signal(ticker, tweets_by_query.get(query))
+
+                    # A. GET NEWS (usually finished by now)
+                    news_score = news_futures[ticker].result()
                     
                     # C. DECISION MATRIX (Dynamic Logic)
-                    sentiment_gap = social_score - news_score
-                    print(f" > {ticker}: News({news_score:.2f}) | Social({social_score:.2f}) | Gap({sentiment_gap:.2f})")
-                    
-                    signal = "HOLD"
-
-                    # --- SCENARIO 1: PURE ARBITRAGE (The Leak) ---
-                    # Twitter knows something, News is silent.
-                    if diversity > DIVERSITY_THRESHOLD and abs(news_score) < 0.2:
-                        
-                        # Case A: Bullish (Dynamic Threshold)
-                        if social_score > BUY_THRESH:
-                            signal = "BUY (Social-Arbitrage)"
-                            print(f"   >>> SIGNAL: {signal}")
-                            log_signal(ticker, signal, social_score, news_score, diversity)
-
-                        # Case B: Bearish (Dynamic Threshold)
-                        elif social_score < -BUY_THRESH:
-                            signal = "SELL (Social-Arbitrage)"
-                            print(f"   >>> SIGNAL: {signal}")
-                            log_signal(ticker, signal, social_score, news_score, diversity)
-
-                    # --- SCENARIO 2: THE REBELLION (The Conflict) ---
-                    # News and Social are fighting. We bet on the Crowd.
-                    
-                    # Case A: News Good, Crowd Bad -> SHORT
-                    elif news_score > BUY_THRESH and social_score < -BUY_THRESH:
-                        signal = "SELL (Rebellion)"
-                        print(f"   >>> SIGNAL: {signal} | Fading the News!")
-                        log_signal(ticker, signal, social_score, news_score, diversity)
-
-                    # Case B: News Bad, Crowd Good -> LONG
-                    elif news_score < -BUY_THRESH and social_score > BUY_THRESH:
-                        signal = "BUY (Rebellion)"
-                        print(f"   >>> SIGNAL: {signal} | Buying the Fear!")
-                        log_signal(ticker, signal, social_score, news_score, diversity)
-
-                    # --- SCENARIO 3: NOISE / CONSENSUS ---
-                    else:
-                        if abs(social_score) > BUY_THRESH and abs(news_score) > BUY_THRESH:
-                             print(f"   [Hold] Consensus (Priced In).")
+                    decide_signal(ticker, news_score, social_score, diversity, BUY_THRESH)
                 
                 except Exception as e:
                     print(f"   [ERROR] Skipping {ticker}: {e}")
@@ -203,6 +278,16 @@ def main():
             elapsed = time.time() - cycle_start_time
             sleep_time = max(10, CHECK_INTERVAL_SECONDS - elapsed)
             
+            cache_stats = get_shared_cache().stats()
+            print(f"   [Cache] Sentiment hit rate {cache_stats['hit_rate']*100:.0f}% "
+                  f"({cache_stats['hits']} hits / {cache_stats['misses']} misses, {cache_stats['disk_entries']} stored)")
+            seen_tweets.save()
+            dedup = seen_tweets.stats()
+            print(f"   [Dedup] {dedup['duplicates']} of {dedup['checked']} tweets already seen "
+                  f"({dedup['dedup_rate']*100:.0f}%), {dedup['entries']} keys stored")
+            rss = net['chromium_rss_mb']
+            print(f"   [Browser] RSS {'n/a' if rss is None else f'{rss:.0f}MB'} | "
+                  f"restart downtime this cycle {restart_downtime:.1f}s (total {net['downtime_seconds']:.1f}s)")
             print(f"Cycle took {elapsed:.1f}s. Sleeping for {sleep_time:.1f}s...")
             time.sleep(sleep_time)
             
@@ -218,6 +303,11 @@ def main():
             scraper.close()
         except:
             pass
+    finally:
+        news_pool.shutdown(wait=False, cancel_futures=True)
+        seen_tweets.save()
+        bus.close()
+        close_ledgers()  # Drain any queued signals to disk
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
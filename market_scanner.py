@@ -1,7 +1,33 @@
-import requests
+import time
 import pandas as pd
 import yfinance as yf # <--- NEW IMPORT
 from io import StringIO
+from threading import Lock
+from concurrent.futures import ThreadPoolExecutor
+from http_client import get_client
+
+# --- CONFIGURATION ---
+VALIDATION_WORKERS = 8          # Candidates checked in parallel
+SLOW_FIELDS_TTL = 6 * 60 * 60   # Market cap barely moves intraday: cache 6h
+CANDIDATES_PER_LIST = 5         # Taken from each Yahoo list
+MAX_PICKS = 3                   # Limit to top 3 quality picks
+
+# --- SLOW-FIELD CACHE (ticker -> (fetched at, market cap)) ---
+_slow_fields = {}
+_slow_fields_lock = Lock()
+
+def _get_market_cap(ticker, stock):
+    now = time.time()
+    with _slow_fields_lock:
+        cached = _slow_fields.get(ticker)
+    if cached and now - cached[0] < SLOW_FIELDS_TTL:
+        return cached[1]
+
+    mkt_cap = stock.fast_info['market_cap'] if hasattr(stock, 'fast_info') else stock.info.get('marketCap', 0)
+    mkt_cap = mkt_cap or 0
+    with _slow_fields_lock:
+        _slow_fields[ticker] = (now, mkt_cap)
+    return mkt_cap
 
 # --- PHYSICS ENGINE (THE FILTER) ---
 def validate_speedboat_physics(ticker):
@@ -10,9 +36,9 @@ def validate_speedboat_physics(ticker):
     1. Mid-Cap ($2B - $50B) -> heavy enough to be safe, light enough to move.
     2. High Liquidity (Avg Vol > 1M) -> ensures we can exit.
     3. Price > $5 -> filters out garbage penny stocks.
+    Market cap comes from a TTL cache; volume and price are live.
     """
     try:
-        # We use 'fast_info' if available, or fallback to .info
         stock = yf.Ticker(ticker)
         
         # 1. Check Volume (Must be Liquid)
@@ -25,7 +51,7 @@ def validate_speedboat_physics(ticker):
         # 2. Check Market Cap (The Goldilocks Zone)
         # We want > $2B to avoid rug pulls. 
         # We allow up to $200B now to catch things like AMD, but avoid Mega-Caps like AAPL/MSFT if you want speed.
-        mkt_cap = stock.fast_info['market_cap'] if hasattr(stock, 'fast_info') else stock.info.get('marketCap', 0)
+        mkt_cap = _get_market_cap(ticker, stock)
 
         if mkt_cap < 2_000_000_000: # Less than 2B is dangerous
             return False 
@@ -41,27 +67,44 @@ def validate_speedboat_physics(ticker):
         # If we can't verify it, ignore it.
         return False
 
+def _timed_validation(ticker):
+    start = time.time()
+    ok = validate_speedboat_physics(ticker)
+    return ticker, ok, time.time() - start
+
+def validate_candidates(tickers):
+    """
+    Runs the physics check on every candidate at once (bounded pool).
+    Returns the passing tickers (in input order) and {ticker: seconds} timings.
+    """
+    tickers = list(tickers)
+    if not tickers:
+        return [], {}
+    with ThreadPoolExecutor(max_workers=min(VALIDATION_WORKERS, len(tickers))) as pool:
+        results = list(pool.map(_timed_validation, tickers))
+
+    passed = [ticker for ticker, ok, _ in results if ok]
+    timings = {ticker: elapsed for ticker, _, elapsed in results}
+    return passed, timings
+
 def get_market_movers():
     """
     Robust scanner that impersonates a Chrome browser to bypass 
-    Yahoo Finance's 429 Rate Limiting blocks.
+    Yahoo Finance's 429 Rate Limiting blocks (the shared HTTP client
+    backs off and retries on 429s).
     """
     print("--- Scanning Market for Speedboats (Volatile + Liquid) ---")
     
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-        "Accept-Language": "en-US,en;q=0.9",
-    }
-    
+    client = get_client()
     raw_tickers = set()
     
     # URL 1: Top Gainers
     try:
         url_gainers = "https://finance.yahoo.com/gainers"
-        response = requests.get(url_gainers, headers=headers)
+        response = client.get(url_gainers)
         if response.status_code == 200:
             df_gainers = pd.read_html(StringIO(response.text))[0]
-            top_gainers = df_gainers['Symbol'].head(5).tolist() # Grab top 5 to filter later
+            top_gainers = df_gainers['Symbol'].head(CANDIDATES_PER_LIST).tolist() # Grab top 5 to filter later
             raw_tickers.update(top_gainers)
     except Exception as e:
         print(f"Error fetching Gainers: {e}")
@@ -69,27 +112,26 @@ def get_market_movers():
     # URL 2: Most Active
     try:
         url_active = "https://finance.yahoo.com/most-active"
-        response = requests.get(url_active, headers=headers)
+        response = client.get(url_active)
         if response.status_code == 200:
             df_active = pd.read_html(StringIO(response.text))[0]
-            top_active = df_active['Symbol'].head(5).tolist()
+            top_active = df_active['Symbol'].head(CANDIDATES_PER_LIST).tolist()
             raw_tickers.update(top_active)
     except Exception as e:
         print(f"Error fetching Active: {e}")
 
-    # --- THE FILTERING PHASE ---
-    final_tickers = []
+    # --- THE FILTERING PHASE (all candidates in parallel) ---
     print(f"   > Raw Candidates: {list(raw_tickers)}")
     
-    for t in raw_tickers:
-        if validate_speedboat_physics(t):
-            final_tickers.append(t)
-        else:
-            # We don't print every rejection to keep logs clean, but we skip them.
-            pass
+    start = time.time()
+    final_tickers, timings = validate_candidates(sorted(raw_tickers))
+    # One compact line: how long each check took and whether it passed
+    if timings:
+        report = ", ".join(f"{t} {secs:.2f}s{'+' if t in final_tickers else '-'}" for t, secs in timings.items())
+        print(f"   > Validated {len(timings)} candidates in {time.time() - start:.2f}s [{report}]")
             
     # Limit to top 3 quality picks
-    final_tickers = final_tickers[:3]
+    final_tickers = final_tickers[:MAX_PICKS]
 
     if not final_tickers:
         print("   > No Speedboats found. Using Safe Watchlist.")
@@ -1,6 +1,6 @@
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
+from history_store import load_history
 
 # CONSTANTS
 LOG_FILE = "trade_log.csv"
@@ -41,7 +41,9 @@ def calculate_sharpe(df):
 
 def generate_report():
     try:
-        df = pd.read_csv(LOG_FILE)
+        df = load_history('trades')
+        if df.empty:
+            raise FileNotFoundError(LOG_FILE)
         
         # Filter for closed trades to see realized gains
         closed_trades = df[df['Action'] == 'CLOSE']
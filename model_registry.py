@@ -0,0 +1,184 @@
+import os
+import time
+from threading import Lock
+
+# --- THE TWIN ENGINES ---
+# 'news'   -> ProsusAI: formal headlines
+# 'social' -> FinTwitBERT: slang/emojis
+MODEL_SPECS = {
+    'news': "ProsusAI/finbert",
+    'social': "StephanAkkerman/FinTwitBERT-sentiment",
+}
+
+# --- INFERENCE BACKENDS (CPU only) ---
+# 'torch' -> PyTorch fp32 (the reference)
+# 'int8'  -> PyTorch dynamic int8 quantization of the Linear layers
+# 'onnx'  -> ONNX Runtime export (needs: pip install optimum[onnxruntime])
+BACKENDS = ('torch', 'int8', 'onnx')
+DEFAULT_BACKEND = 'torch'
+ONNX_EXPORT_DIR = "onnx_models"
+
+# Fixed corpus for the parity check (headline-style and tweet-style text)
+PARITY_CORPUS = [
+    "Company beats earnings expectations and raises full-year guidance",
+    "Shares plunge after the CEO resigns amid accounting probe",
+    "Board announces quarterly dividend in line with prior quarter",
+    "Regulators approve the merger, clearing the way for the deal to close",
+    "Analyst downgrades the stock to sell citing weak demand",
+    "Revenue misses estimates as margins shrink",
+    "$TSLA to the moon 🚀🚀 loading more calls",
+    "this stock is dead money, puts printing",
+    "anyone watching $NVDA today? flat all morning",
+    "Huge volume spike on $AMD, breakout incoming",
+]
+
+def configured_backend(config_file=None):
+    """
+    Reads 'sentiment_backend' from trading_config.json (falls back to fp32).
+    Just the one key: scraper-only tools shouldn't build a whole ConfigManager.
+    """
+    from config_manager import read_setting, CONFIG_FILE
+    backend = read_setting("sentiment_backend", DEFAULT_BACKEND, config_file or CONFIG_FILE)
+    return backend if backend in BACKENDS else DEFAULT_BACKEND
+
+class ModelRegistry:
+    """
+    Loads each BERT pipeline the first time it is asked for (not at import).
+    Scraper-only tools never touch transformers/torch, so they start instantly.
+    """
+    def __init__(self, specs=None, backend=None):
+        self.specs = specs or MODEL_SPECS
+        self._backend = backend
+        self.pipelines = {}
+        self.load_times = {}  # source_type -> seconds spent loading
+        self._lock = Lock()   # Two threads asking at once must not load twice
+
+    def model_name(self, source_type):
+        return self.specs['social'] if source_type == 'social' else self.specs['news']
+
+    @property
+    def backend(self):
+        """The inference backend, resolved from config the first time it's needed."""
+        if self._backend is None:
+            self._backend = configured_backend()
+        return self._backend
+
+    def score_key(self, source_type):
+        """Name used to key cached scores (scores differ slightly per backend)."""
+        name = self.model_name(source_type)
+        return name if self.backend == 'torch' else f"{name}@{self.backend}"
+
+    def is_loaded(self, source_type):
+        return source_type in self.pipelines
+
+    def get(self, source_type='news'):
+        """Returns the pipeline for this source type, loading it on first use."""
+        source_type = 'social' if source_type == 'social' else 'news'
+        if source_type in self.pipelines:
+            return self.pipelines[source_type]
+
+        with self._lock:
+            if source_type not in self.pipelines:
+                self.pipelines[source_type] = self._load(source_type)
+        return self.pipelines[source_type]
+
+    def _load(self, source_type):
+        # Heavy imports live here so importing this module costs nothing
+        from transformers import BertTokenizer, pipeline
+
+        model_name = self.model_name(source_type)
+        print(f" > Loading {source_type.title()} Brain ({model_name}, backend={self.backend})...")
+        start = time.time()
+        try:
+            tokenizer = BertTokenizer.from_pretrained(model_name)
+            if self.backend == 'int8':
+                model = self._load_int8(model_name)
+            elif self.backend == 'onnx':
+                model = self._load_onnx(model_name)
+            else:
+                model = model_name
+            nlp = pipeline("sentiment-analysis", model=model, tokenizer=tokenizer)
+        except Exception as e:
+            raise RuntimeError(f"Could not load {model_name} ({self.backend}): {e}") from e
+
+        self.load_times[source_type] = time.time() - start
+        print(f"   [Ready] {source_type.title()} Brain loaded in {self.load_times[source_type]:.1f}s")
+        return nlp
+
+    def _load_int8(self, model_name):
+        """fp32 weights, then the Linear layers swapped for dynamic int8 versions."""
+        import torch
+        from transformers import BertForSequenceClassification
+
+        model = BertForSequenceClassification.from_pretrained(model_name)
+        model.eval()
+        return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    def _load_onnx(self, model_name):
+        """Exports to ONNX once (kept in ONNX_EXPORT_DIR), then runs it on ONNX Runtime."""
+        try:
+            from optimum.onnxruntime import ORTModelForSequenceClassification
+        except ImportError:
+            raise RuntimeError("ONNX backend needs 'optimum[onnxruntime]' installed")
+
+        export_dir = os.path.join(ONNX_EXPORT_DIR, model_name.replace("/", "__"))
+        if os.path.exists(export_dir):
+            return ORTModelForSequenceClassification.from_pretrained(export_dir)
+
+        print(f"   [ONNX] Exporting {model_name} (one time)...")
+        model = ORTModelForSequenceClassification.from_pretrained(model_name, export=True)
+        model.save_pretrained(export_dir)
+        return model
+
+    def warm_up(self, *source_types):
+        """
+        Loads the given brains now (default: both) so the first scoring call
+        doesn't pay for it. Returns {source_type: load seconds}.
+        """
+        for source_type in source_types or ('news', 'social'):
+            self.get(source_type)
+        return dict(self.load_times)
+
+# Shared instance (one set of weights per process)
+models = ModelRegistry()
+
+def check_backend_parity(backend, source_type='news', corpus=None):
+    """
+    Scores a fixed corpus with fp32 and with `backend` and reports the drift.
+    Returns max/mean absolute score difference, label agreement and timings.
+    """
+    from news_scraper import _label_to_score
+
+    corpus = corpus or PARITY_CORPUS
+    report = {'backend': backend, 'source_type': source_type}
+
+    runs = {}
+    for name in ('torch', backend):
+        nlp = ModelRegistry(backend=name).get(source_type)
+        nlp(corpus[:2], truncation=True, padding=True)  # warm-up pass, not timed
+        start = time.time()
+        results = nlp(corpus, batch_size=len(corpus), truncation=True, padding=True)
+        runs[name] = (time.time() - start, [_label_to_score(r) for r in results])
+
+    base_time, base_scores = runs['torch']
+    test_time, test_scores = runs[backend]
+    drift = [abs(a - b) for a, b in zip(base_scores, test_scores)]
+    same_sign = [(a > 0) == (b > 0) and (a < 0) == (b < 0) for a, b in zip(base_scores, test_scores)]
+
+    report['max_drift'] = max(drift)
+    report['mean_drift'] = sum(drift) / len(drift)
+    report['label_agreement'] = sum(same_sign) / len(same_sign)
+    report['fp32_seconds'] = base_time
+    report['backend_seconds'] = test_time
+    report['speedup'] = base_time / test_time if test_time > 0 else 0.0
+    return report
+
+# Run this file directly to check the configured backend against fp32
+if __name__ == "__main__":
+    backend = configured_backend()
+    print(f"--- BACKEND PARITY CHECK ({backend} vs torch fp32) ---")
+    for source_type in ('news', 'social'):
+        r = check_backend_parity(backend, source_type)
+        print(f"{source_type.upper():<7} | max drift {r['max_drift']:.4f} | mean drift {r['mean_drift']:.4f} | "
+              f"labels agree {r['label_agreement']*100:.0f}% | {r['fp32_seconds']*1000:.0f}ms -> "
+              f"{r['backend_seconds']*1000:.0f}ms ({r['speedup']:.1f}x)")
@@ -1,31 +1,17 @@
 import pandas as pd
 from bs4 import BeautifulSoup
-import requests
 from datetime import datetime
-from transformers import BertTokenizer, BertForSequenceClassification, pipeline
-import torch
-
-# --- SETUP: Initialize DUAL BRAINS ---
-print("--- Initializing The Twin Engines (This takes RAM!) ---")
+from threading import Lock
+from http_client import get_client
 
 try:
-    # 1. THE NEWS ANCHOR (ProsusAI) - For Formal Headlines
-    print(" > Loading News Brain (ProsusAI)...")
-    model_news = "ProsusAI/finbert"
-    tokenizer_news = BertTokenizer.from_pretrained(model_news)
-    nlp_news = pipeline("sentiment-analysis", model=model_news, tokenizer=tokenizer_news)
-
-    # 2. THE TWITTER SPECIALIST (FinTwitBERT) - For Slang/Emojis
-    print(" > Loading Social Brain (FinTwitBERT)...")
-    model_social = "StephanAkkerman/FinTwitBERT-sentiment"
-    tokenizer_social = BertTokenizer.from_pretrained(model_social)
-    nlp_social = pipeline("sentiment-analysis", model=model_social, tokenizer=tokenizer_social)
-    
-    print("--- Dual Brains Ready ---")
-    
-except Exception as e:
-    print(f"CRITICAL ERROR loading models: {e}")
-    exit()
+    import lxml.html as lxml_html  # Optional: C parser, much faster than html.parser
+except ImportError:
+    lxml_html = None
+
+# --- SETUP: DUAL BRAINS (loaded on first use, see model_registry.py) ---
+from model_registry import models
+from sentiment_cache import get_shared_cache
 
 # --- VERITY WEIGHTS ---
 VERITY_WEIGHTS = {
@@ -41,116 +27,265 @@ VERITY_WEIGHTS = {
     'generic_default': 0.5
 }
 
+# --- BATCH INFERENCE ---
+SENTIMENT_BATCH_SIZE = 32   # Texts per forward pass (raise it if you have the RAM)
+MAX_TOKENS = 512            # BERT hard limit
+USE_SENTIMENT_CACHE = True  # Look scores up by (model, text) before running the model
+
+def _label_to_score(result):
+    """
+    Turns one raw pipeline result into a signed score.
+    ProsusAI uses: 'positive', 'negative', 'neutral'
+    FinTwitBERT uses: 'bullish', 'bearish', 'neutral'
+    """
+    label = result['label'].lower()
+    confidence = result['score']
+
+    if 'positive' in label or 'bullish' in label:
+        return confidence        # e.g., +0.99
+    elif 'negative' in label or 'bearish' in label:
+        return -confidence       # e.g., -0.99
+    else: # neutral
+        return 0.0
+
 def get_sentiment(text, source_type='news'):
     """
     Analyzes text using the appropriate brain.
     source_type: 'news' (default) or 'social'
     """
     if not text: return 0.0
-    
-    try:
-        # Select the correct brain
-        if source_type == 'social':
-            results = nlp_social(str(text), truncation=True, max_length=512)
-        else:
-            results = nlp_news(str(text), truncation=True, max_length=512)
-            
-        result = results[0]
-        label = result['label'].lower()
-        confidence = result['score']
-        
-        # --- MAPPING LABELS (THE FIX) ---
-        # ProsusAI uses: 'positive', 'negative', 'neutral'
-        # FinTwitBERT uses: 'bullish', 'bearish', 'neutral'
-        
-        if 'positive' in label or 'bullish' in label:
-            return confidence        # e.g., +0.99
-        elif 'negative' in label or 'bearish' in label:
-            return -confidence       # e.g., -0.99
-        else: # neutral
-            return 0.0
-            
-    except Exception as e:
-        print(f"Error analyzing '{text[:15]}...': {e}")
-        return 0.0
+    return get_sentiment_batch([text], source_type=source_type)[0]
 
-def get_finviz_news(ticker):
+def get_sentiment_batch(texts, source_type='news', batch_size=None, strict=False):
     """
-    Scrapes Finviz news.
+    Scores a whole list of texts in padded forward passes.
+    Texts are bucketed by length first so each batch pads to a similar size
+    (short tweets don't get padded out to the length of a long headline).
+    Returns one score per input, in the original order. Empty texts score 0.0.
+    Texts already scored by this model come straight from the sentiment cache.
+    A batch the model fails on scores 0.0, unless strict=True, which raises
+    instead (for callers that keep the scores).
     """
-    url = f'https://finviz.com/quote.ashx?t={ticker}'
-    headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
-    
-    try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-    except Exception as e:
-        print(f"Error connecting to Finviz for {ticker}: {e}")
-        return pd.DataFrame()
+    batch_size = batch_size or SENTIMENT_BATCH_SIZE
+    scores = [0.0] * len(texts)
 
-    soup = BeautifulSoup(response.text, 'html.parser')
-    news_table = soup.find(id='news-table')
-    
-    if not news_table:
-        print(f"No news found for {ticker}")
-        return pd.DataFrame()
-    
-    parsed_data = []
-    rows = news_table.find_all('tr')
-    
-    current_date = None
-    
-    for row in rows:
+    # Keep track of where each text came from
+    indexed = [(i, str(t)) for i, t in enumerate(texts) if t]
+
+    # 1. CACHE LOOKUP: only the misses go to the model
+    model_name = models.score_key(source_type)
+    cache = get_shared_cache() if USE_SENTIMENT_CACHE and indexed else None
+    if cache:
+        hits = cache.get_many(model_name, [text for _, text in indexed])
+        for pos, score in hits.items():
+            scores[indexed[pos][0]] = score
+        indexed = [item for pos, item in enumerate(indexed) if pos not in hits]
+
+    # 2. Sort by length (the buckets)
+    indexed.sort(key=lambda item: len(item[1]))
+
+    nlp = models.get(source_type) if indexed else None
+
+    for start in range(0, len(indexed), batch_size):
+        bucket = indexed[start:start + batch_size]
+        batch_texts = [text for _, text in bucket]
+        try:
+            results = nlp(batch_texts, batch_size=len(batch_texts),
+                          truncation=True, padding=True, max_length=MAX_TOKENS)
+            batch_scores = [_label_to_score(result) for result in results]
+        except Exception as e:
+            print(f"Error analyzing batch of {len(batch_texts)} ('{batch_texts[0][:15]}...'): {e}")
+            if strict:
+                raise
+            continue
+
+        for (i, _), score in zip(bucket, batch_scores):
+            scores[i] = score
+        if cache:
+            cache.put_many(model_name, batch_texts, batch_scores)
+
+    return scores
+
+# --- FINVIZ PARSER ---
+NEWS_COLUMNS = ['Timestamp', 'Headline', 'Source', 'URL']
+FINVIZ_URL = 'https://finviz.com/quote.ashx?t={ticker}'
+
+# Newest headline already handed out per ticker (for the "since last seen" path)
+_last_seen = {}
+_last_seen_lock = Lock()
+
+def _news_table_fragment(html):
+    """
+    Selective parse: cut out just the <table id="news-table"> markup so the
+    parser never touches the rest of the (large) quote page.
+    """
+    marker = html.find('id="news-table"')
+    if marker == -1:
+        return None
+    start = html.rfind('<table', 0, marker)
+    end = html.find('</table>', marker)
+    if start == -1 or end == -1:
+        return None
+    return html[start:end + len('</table>')]
+
+def _iter_raw_rows(fragment):
+    """Yields (date_text, headline, full_cell_text, url) for each news row, newest first."""
+    if lxml_html is not None:
+        table = lxml_html.fragment_fromstring(fragment)
+        for row in table.iter('tr'):
+            cols = row.findall('td')
+            if len(cols) < 2:
+                continue
+            links = cols[1].xpath('.//a')
+            if not links:
+                continue
+            yield (cols[0].text_content().strip(), links[0].text_content().strip(),
+                   cols[1].text_content().strip(), links[0].get('href'))
+        return
+
+    soup = BeautifulSoup(fragment, 'html.parser')
+    for row in soup.find_all('tr'):
         cols = row.find_all('td')
         if len(cols) < 2:
             continue
-            
-        date_text = cols[0].text.strip()
         link_tag = cols[1].find('a')
-        
         if not link_tag:
             continue
-            
-        headline = link_tag.text.strip()
-        url_link = link_tag['href']
-        
-        full_text = cols[1].text.strip()
+        yield cols[0].text.strip(), link_tag.text.strip(), cols[1].text.strip(), link_tag['href']
+
+def _news_key(record):
+    return record['URL'] or record['Headline']
+
+def parse_finviz_news(html, stop_at=None):
+    """
+    Turns a Finviz quote page into news records (dicts with NEWS_COLUMNS keys),
+    newest first. Stops as soon as it reaches the record whose key is `stop_at`.
+    """
+    fragment = _news_table_fragment(html)
+    if fragment is None:
+        return None
+
+    records = []
+    current_date = None
+    today_str = datetime.now().strftime('%b-%d-%y')
+
+    for date_text, headline, full_text, url_link in _iter_raw_rows(fragment):
         source_text = full_text.replace(headline, "").strip()
         
         if 'Today' in date_text:
-            today_str = datetime.now().strftime('%b-%d-%y')
             date_text = date_text.replace('Today', today_str)
             
         if ' ' in date_text:
-            date_part, time_part = date_text.split(' ')
+            date_part, time_part = date_text.split(' ', 1)
             current_date = date_part
         else:
             time_part = date_text
             
-        full_timestamp = f"{current_date} {time_part}"
-        
-        parsed_data.append([full_timestamp, headline, source_text, url_link])
+        record = {
+            'Timestamp': f"{current_date} {time_part}",
+            'Headline': headline,
+            'Source': source_text,
+            'URL': url_link,
+        }
+        if stop_at is not None and _news_key(record) == stop_at:
+            break
+        records.append(record)
+
+    return records
+
+def _fetch_finviz_page(ticker):
+    try:
+        # Pooled session: keep-alive, per-host rate limit, retries, conditional GET
+        response = get_client().get(FINVIZ_URL.format(ticker=ticker))
+        response.raise_for_status()
+        return response
+    except Exception as e:
+        print(f"Error connecting to Finviz for {ticker}: {e}")
+        return None
+
+def get_finviz_news(ticker):
+    """
+    Scrapes Finviz news.
+    """
+    response = _fetch_finviz_page(ticker)
+    if response is None:
+        return pd.DataFrame()
+
+    records = parse_finviz_news(response.text)
+    if records is None:
+        print(f"No news found for {ticker}")
+        return pd.DataFrame()
         
-    return pd.DataFrame(parsed_data, columns=['Timestamp', 'Headline', 'Source', 'URL'])
+    return pd.DataFrame(records, columns=NEWS_COLUMNS)
+
+def get_finviz_news_since(ticker):
+    """
+    Only the headlines that appeared since the last *committed* call for this
+    ticker (the first call returns the whole table). An unchanged page (HTTP
+    304) costs no parsing at all. Returns (records newest first, key), where
+    key marks the newest record: pass it to mark_news_seen() once the records
+    are safely handled, so a failure downstream means they come back next time.
+    """
+    response = _fetch_finviz_page(ticker)
+    if response is None:
+        return [], None
+
+    with _last_seen_lock:
+        last_key = _last_seen.get(ticker)
+    if response.not_modified and last_key is not None:
+        return [], None
+
+    records = parse_finviz_news(response.text, stop_at=last_key)
+    if records is None:
+        print(f"No news found for {ticker}")
+        return [], None
+
+    return records, (_news_key(records[0]) if records else None)
+
+def mark_news_seen(ticker, key):
+    """Commits the newest handled headline (from get_finviz_news_since) for this ticker."""
+    if key is None:
+        return
+    with _last_seen_lock:
+        _last_seen[ticker] = key
+
+def get_verity(source, url):
+    """How much we trust a headline, from its source name or link."""
+    source = str(source).lower().replace(" ", "")
+    url = str(url).lower()
+    for key in VERITY_WEIGHTS:
+        if key.replace(".com", "") in source: return VERITY_WEIGHTS[key]
+    for key in VERITY_WEIGHTS:
+        if key in url: return VERITY_WEIGHTS[key]
+    return VERITY_WEIGHTS['generic_default']
+
+def score_news_records(records):
+    """
+    Adds Sentiment_Score and Verity_Score to each record (one batched model pass).
+    Raises if the model fails, rather than filling in 0.0 scores.
+    """
+    scores = get_sentiment_batch([r['Headline'] for r in records], source_type='news', strict=True)
+    for record, score in zip(records, scores):
+        record['Sentiment_Score'] = score
+        record['Verity_Score'] = get_verity(record['Source'], record['URL'])
+    return records
+
+def composite_news_score(records):
+    """Verity-weighted average sentiment over scored records."""
+    total_weight = sum(r['Verity_Score'] for r in records)
+    if total_weight <= 0:
+        return 0
+    return sum(r['Sentiment_Score'] * r['Verity_Score'] for r in records) / total_weight
 
 def calculate_metrics(df):
     if df.empty:
         return df, 0
         
-    # USE NEWS BRAIN
-    df['Sentiment_Score'] = df['Headline'].apply(lambda x: get_sentiment(x, source_type='news'))
+    # USE NEWS BRAIN (one batched pass over every headline)
+    df['Sentiment_Score'] = get_sentiment_batch(df['Headline'].tolist(), source_type='news')
     
     # Verity Logic
-    def get_verity(row):
-        source = str(row['Source']).lower().replace(" ", "")
-        url = str(row['URL']).lower()
-        for key in VERITY_WEIGHTS:
-            if key.replace(".com", "") in source: return VERITY_WEIGHTS[key]
-        for key in VERITY_WEIGHTS:
-            if key in url: return VERITY_WEIGHTS[key]
-        return VERITY_WEIGHTS['generic_default']
-        
-    df['Verity_Score'] = df.apply(get_verity, axis=1)
+    df['Verity_Score'] = [get_verity(src, url) for src, url in zip(df['Source'], df['URL'])]
     df['Weighted_Signal'] = df['Sentiment_Score'] * df['Verity_Score']
     
     total_weight = df['Verity_Score'].sum()
@@ -1,20 +1,25 @@
+import numpy as np
 import pandas as pd
-import yfinance as yf
 import time
-import os
-import csv
-from datetime import datetime, timedelta
+from datetime import datetime
 from threading import Lock # <--- IMPORT LOCK
+from signal_tail import SignalTailer
+from signal_bus import SignalSubscriber, LatencyTracker
+from price_feed import PriceSnapshot
+from position_book import PositionBook, TRAILING_STOP, STOP_LOSS, TAKE_PROFIT
+from ledger import get_ledger, close_all as close_ledgers
+from history_store import load_history, attach_history
 
 # --- IMPORT THE DYNAMIC BRAIN ---
 try:
-    from config_manager import ConfigManager
+    from config_manager import shared_config
 except ImportError:
-    ConfigManager = None
+    shared_config = None
 
 # --- CONFIGURATION ---
 SIGNAL_FILE = "sentiment_signals.csv"
 TRADE_LOG_FILE = "trade_log.csv"
+TRADE_LOG_HEADER = ['Timestamp', 'Ticker', 'Action', 'Price', 'Shares', 'PnL_Realized']
 POSITION_SIZE = 100000  
 CHECK_INTERVAL = 10     
 STOP_LOSS_PCT = 0.01    
@@ -24,119 +29,106 @@ MIN_SCALP_PROFIT = 2.00
 TRAILING_ACTIVATION = 100.0  
 TRAILING_CALLBACK = 0.05     
 
+# The exit rules as one dict, so a backtest can run with different values
+EXIT_RULES = {
+    'stop_loss_pct': STOP_LOSS_PCT,
+    'take_profit_pct': TAKE_PROFIT_PCT,
+    'time_stop_minutes': TIME_STOP_MINUTES,
+    'min_scalp_profit': MIN_SCALP_PROFIT,
+    'trailing_activation': TRAILING_ACTIVATION,
+    'trailing_callback': TRAILING_CALLBACK,
+}
+
 # --- THE TALKING STICK ---
 print_lock = Lock() 
 
 class PaperTrader:
-    def __init__(self):
-        self.positions = {} 
+    """
+    Live by default. The backtester builds one with a replay price source, a
+    simulated clock, an in-memory ledger and its own config, which leaves out
+    the live wiring (bus, signal file, trade_log.csv).
+    """
+    def __init__(self, price_source=None, clock=datetime.now, ledger=None, config=None,
+                 exit_rules=None, verbose=True):
+        live = ledger is None
+        self.clock = clock
+        self.verbose = verbose
+        self.rules = dict(EXIT_RULES, **(exit_rules or {}))
+        self.positions = PositionBook()  # Array-backed: exits are checked for all positions at once
+        # One batched quote fetch per tick (TTL measured on our clock)
+        self.prices = PriceSnapshot(price_source, clock=lambda: self.clock().timestamp())
         self.trade_log = set() 
         self.realized_pnl = 0.0 
+        self.bus = SignalSubscriber() if live else None
+        self.latency = LatencyTracker()  # Signal published -> order opened
         
-        if ConfigManager:
-            self.cm = ConfigManager()
+        if config is not None:
+            self.cm = config
+        elif shared_config and live:
+            self.cm = shared_config()
         else:
             self.cm = None
+
+        if not live:
+            self.signals = None
+            self.ledger = ledger
+            return
         
-        if os.path.exists(SIGNAL_FILE):
-            try:
-                df = pd.read_csv(SIGNAL_FILE)
-                for index, row in df.iterrows():
-                    unique_id = f"{row['Timestamp']}_{row['Ticker']}"
-                    self.trade_log.add(unique_id)
-            except Exception:
-                pass
+        # Everything already in the file is history: the tailer starts at the end,
+        # and today's signals are marked handled (only today's partition is read).
+        self.signals = SignalTailer(SIGNAL_FILE)
+        self.signals.seek_end()
+        try:
+            today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+            recent = load_history('signals', start=today, columns=['Ticker'])
+            if not recent.empty:
+                stamps = pd.to_datetime(recent['Timestamp']).dt.strftime('%Y-%m-%d %H:%M:%S')
+                self.trade_log.update(stamps + "_" + recent['Ticker'].astype(str))
+        except Exception:
+            pass
         
-        if not os.path.exists(TRADE_LOG_FILE):
-            with open(TRADE_LOG_FILE, 'w', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow(['Timestamp', 'Ticker', 'Action', 'Price', 'Shares', 'PnL_Realized'])
+        # Background writer: creates the file + header if needed, never blocks a trade
+        self.ledger = get_ledger(TRADE_LOG_FILE, TRADE_LOG_HEADER)
+        attach_history(self.ledger, 'trades')  # Parquet copy for the analytics
 
         print("--- PAPER TRADER V3.1 (Trailing Stop + Physics Filter) ---")
 
     def safe_print(self, message):
         """Thread-safe printing helper"""
+        if not self.verbose:
+            return
         with print_lock:
             print(message)
 
     def log_transaction(self, ticker, action, price, shares, pnl=0.0):
-        with open(TRADE_LOG_FILE, 'a', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                ticker, action, price, shares, pnl
-            ])
+        self.ledger.append([
+            self.clock().strftime('%Y-%m-%d %H:%M:%S'),
+            ticker, action, price, shares, pnl
+        ])
 
     def get_live_price(self, ticker):
-        clean_ticker = ticker.replace('$', '')
-        try:
-            # We explicitly ask for regularMarketPrice to avoid '0.0' glitches in pre-market
-            tick = yf.Ticker(clean_ticker)
-            data = tick.fast_info
-            price = data.last_price
-            
-            # SANITY CHECK: Price cannot be zero or negative
-            if price is None or price <= 0.01:
-                return None
-                
-            return price
-        except Exception:
-            # Fallback to slower method if fast_info fails
-            try:
-                data = yf.download(clean_ticker, period="1d", interval="1m", progress=False)
-                if not data.empty:
-                    price = data['Close'].iloc[-1].item()
-                    if price > 0.01: return price
-                return None
-            except:
-                return None
-
-    def check_exits(self):
-        for ticker, pos in list(self.positions.items()):
-            current_price = self.get_live_price(ticker)
-            if not current_price: continue
+        return self.prices.get_price(ticker)
 
-            if pos['type'] == 'LONG':
-                pnl = (current_price - pos['entry']) * pos['shares']
-                pct_change = (current_price - pos['entry']) / pos['entry']
-            else: 
-                pnl = (pos['entry'] - current_price) * pos['shares']
-                pct_change = (pos['entry'] - current_price) / pos['entry']
-
-            if pnl > pos['max_pnl']:
-                pos['max_pnl'] = pnl
-
-            # 1. TRAILING STOP
-            if pos['max_pnl'] > TRAILING_ACTIVATION:
-                drop_from_peak = pos['max_pnl'] - pnl
-                allowed_drop = pos['max_pnl'] * TRAILING_CALLBACK
-                if drop_from_peak > allowed_drop:
-                    self.safe_print(f"   [TRAILING STOP] {ticker} Profit dropped from ${pos['max_pnl']:.2f} to ${pnl:.2f}. Locking gain.")
-                    self.close_position(ticker, current_price, "TRAILING_STOP")
-                    continue
+    def check_exits(self, quotes=None):
+        if quotes is None:
+            quotes = self.prices.snapshot(list(self.positions))
 
-            # 2. HARD STOP LOSS
-            if pct_change < -STOP_LOSS_PCT:
-                self.safe_print(f"   [STOP LOSS] {ticker} hit -{STOP_LOSS_PCT*100}% trigger.")
-                self.close_position(ticker, current_price, "STOP_LOSS")
-                continue
-
-            # 3. TAKE PROFIT
-            if pct_change > TAKE_PROFIT_PCT:
-                self.safe_print(f"   [TAKE PROFIT] {ticker} hit +{TAKE_PROFIT_PCT*100}% trigger!")
-                self.close_position(ticker, current_price, "TAKE_PROFIT")
-                continue
-
-            # 4. TIME DECAY
-            time_held = datetime.now() - pos['time']
-            if time_held > timedelta(minutes=TIME_STOP_MINUTES):
-                if pnl > MIN_SCALP_PROFIT:
-                    self.safe_print(f"   [TIME STOP] Held {ticker} > {TIME_STOP_MINUTES}m and Green. Exiting.")
-                    self.close_position(ticker, current_price, "TIME_EXIT")
+        # Every rule over every position in one pass; only the exits come back
+        rules = self.rules
+        for ticker, reason, current_price, pnl, max_pnl in self.positions.check_exits(quotes, self.clock(), rules):
+            if reason == TRAILING_STOP:
+                self.safe_print(f"   [TRAILING STOP] {ticker} Profit dropped from ${max_pnl:.2f} to ${pnl:.2f}. Locking gain.")
+            elif reason == STOP_LOSS:
+                self.safe_print(f"   [STOP LOSS] {ticker} hit -{rules['stop_loss_pct']*100}% trigger.")
+            elif reason == TAKE_PROFIT:
+                self.safe_print(f"   [TAKE PROFIT] {ticker} hit +{rules['take_profit_pct']*100}% trigger!")
+            else:
+                self.safe_print(f"   [TIME STOP] Held {ticker} > {rules['time_stop_minutes']}m and Green. Exiting.")
+            self.close_position(ticker, current_price, reason)
 
     def close_position(self, ticker, price, reason):
         if ticker in self.positions:
-            pos = self.positions[ticker]
+            pos = self.positions.close(ticker)
             if pos['type'] == 'LONG':
                 pnl = (price - pos['entry']) * pos['shares']
             else: 
@@ -145,10 +137,9 @@ class PaperTrader:
             self.realized_pnl += pnl
             self.safe_print(f"   [CLOSE {reason}] PnL: ${pnl:,.2f}")
             self.log_transaction(ticker, f"CLOSE_{reason}", price, pos['shares'], pnl)
-            del self.positions[ticker]
 
             if self.cm:
-                self.cm.update_dynamic_thresholds()
+                self.cm.update_dynamic_thresholds(pnl)
 
     def execute_trade(self, signal_row):
         ticker = signal_row['Ticker']
@@ -184,66 +175,99 @@ class PaperTrader:
         self.safe_print(f"\n>>> SIGNAL: {ticker} | {action} @ ${current_price:.4f}")
 
         shares = POSITION_SIZE / current_price
-        self.positions[ticker] = {
-            'type': new_trade_type,
-            'shares': shares,
-            'entry': current_price,
-            'time': datetime.now(),
-            'max_pnl': -99999.0 
-        }
+        self.positions.open(ticker, new_trade_type, shares, current_price, self.clock())
         self.safe_print(f"   [OPEN {new_trade_type}] {shares:.2f} shares")
         self.log_transaction(ticker, f"OPEN_{new_trade_type}", current_price, shares, 0.0)
         self.trade_log.add(unique_id)
 
-    def print_dashboard(self):
+        if signal_row.get('Published_At'):
+            self.latency.record(signal_row['Published_At'])
+
+    def print_dashboard(self, quotes=None):
+        if quotes is None:
+            quotes = self.prices.snapshot(list(self.positions))
+
+        # One vectorized mark of the whole book (also raises the peaks)
+        book = self.positions
+        prices, pnl, _, valid = book.mark(quotes)
+        total_unrealized = float(pnl[valid].sum())
+
         with print_lock: # <--- THE FIX FOR STUTTERING
             print("\n" + "="*80)
-            print(f"PORTFOLIO DASHBOARD ({datetime.now().strftime('%H:%M:%S')})")
+            print(f"PORTFOLIO DASHBOARD ({self.clock().strftime('%H:%M:%S')})")
             print(f"{'TICKER':<8} | {'TYPE':<6} | {'ENTRY':<8} | {'CURRENT':<8} | {'PnL ($)':<10} | {'MAX PnL':<10}")
             print("-" * 80)
             
-            total_unrealized = 0
-            for ticker, pos in list(self.positions.items()):
-                curr_price = self.get_live_price(ticker)
-                if not curr_price: continue
-                
-                if pos['type'] == 'LONG':
-                    pnl = (curr_price - pos['entry']) * pos['shares']
-                else: 
-                    pnl = (pos['entry'] - curr_price) * pos['shares']
-                
-                if pnl > pos['max_pnl']: pos['max_pnl'] = pnl
-                    
-                total_unrealized += pnl
-                print(f"{ticker:<8} | {pos['type']:<6} | {pos['entry']:<8.4f} | {curr_price:<8.4f} | {pnl:>10,.2f} | {pos['max_pnl']:>10,.2f}")
+            for i in np.flatnonzero(valid):
+                pos_type = 'LONG' if book.side[i] > 0 else 'SHORT'
+                print(f"{book.tickers[i]:<8} | {pos_type:<6} | {book.entry[i]:<8.4f} | {prices[i]:<8.4f} | {pnl[i]:>10,.2f} | {book.max_pnl[i]:>10,.2f}")
                 
             print("-" * 80)
             print(f"REALIZED PnL:   ${self.realized_pnl:,.2f}")
             print(f"UNREALIZED PnL: ${total_unrealized:,.2f}")
             print(f"TOTAL PROFIT:   ${self.realized_pnl + total_unrealized:,.2f}")
+            latency = self.latency.summary()
+            if latency:
+                print(f"SIGNAL->ORDER:  avg {latency['avg_ms']:,.0f}ms | p50 {latency['p50_ms']:,.0f}ms | "
+                      f"max {latency['max_ms']:,.0f}ms ({latency['count']} pushed orders)")
             print("="*80 + "\n")
 
+    def trade_safely(self, signal_row):
+        """execute_trade for a live signal: a failure is logged and skipped, the loop keeps going."""
+        try:
+            self.execute_trade(signal_row)
+        except Exception as e:
+            self.safe_print(f"   [ERROR] Could not trade {signal_row.get('Ticker')} "
+                            f"signal from {signal_row.get('Timestamp')}: {e}")
+
+    def tick(self):
+        """One polling tick of the live loop: tailed signals, exits, dashboard."""
+        # 1. Read Signals (only the rows appended since the last tick;
+        #    anything the bus already delivered is skipped by trade_log).
+        #    read_new() has already moved past them, so each row is
+        #    traded on its own and a bad one can't drop the rest.
+        try:
+            rows = self.signals.read_new()
+        except Exception as e:
+            self.safe_print(f"Error reading CSV: {e}")
+            rows = []
+        for row in rows:
+            self.trade_safely(row)
+
+        # 2. Check Exits (one batched quote for every open ticker)
+        quotes = self.prices.snapshot(list(self.positions))
+        self.check_exits(quotes)
+
+        # 3. Print Status (the same quotes: a slow download can outlast
+        #    the snapshot TTL, and the dashboard must not fetch again)
+        if self.positions:
+            self.print_dashboard(quotes)
+        else:
+            self.safe_print(f"[{self.clock().strftime('%H:%M:%S')}] No positions. Listening...")
+
     def run(self):
-        while True:
-            # 1. Read Signals
-            if os.path.exists(SIGNAL_FILE):
-                try:
-                    df = pd.read_csv(SIGNAL_FILE)
-                    for index, row in df.tail(5).iterrows():
-                        self.execute_trade(row)
-                except Exception as e:
-                    self.safe_print(f"Error reading CSV: {e}")
-            
-            # 2. Check Exits
-            self.check_exits()
+        self.bus.start()
+        next_tick = 0.0
 
-            # 3. Print Status
-            if self.positions:
-                self.print_dashboard()
-            else:
-                self.safe_print(f"[{datetime.now().strftime('%H:%M:%S')}] No positions. Listening...")
-                
-            time.sleep(CHECK_INTERVAL)
+        try:
+            while True:
+                # 0. PUSHED SIGNALS: trade them the moment they arrive,
+                #    otherwise just wait out the rest of the tick.
+                signal = self.bus.get(timeout=next_tick - time.time())
+                if signal:
+                    self.trade_safely(signal)
+                    continue
+
+                if time.time() < next_tick:
+                    continue
+                next_tick = time.time() + CHECK_INTERVAL
+
+                self.tick()
+        except KeyboardInterrupt:
+            self.safe_print("\nTrader Stopped. Flushing ledger...")
+        finally:
+            self.bus.close()
+            close_ledgers()
 
 if __name__ == "__main__":
     bot = PaperTrader()
@@ -0,0 +1,121 @@
+from datetime import datetime
+
+import numpy as np
+
+# --- CONFIGURATION ---
+INITIAL_CAPACITY = 64
+NO_PEAK_YET = -99999.0   # max_pnl of a position that hasn't been marked yet
+
+# Exit reasons, in the order the rules are checked (first match wins)
+TRAILING_STOP = "TRAILING_STOP"
+STOP_LOSS = "STOP_LOSS"
+TAKE_PROFIT = "TAKE_PROFIT"
+TIME_EXIT = "TIME_EXIT"
+
+class PositionBook:
+    """
+    Open positions as parallel NumPy arrays (one slot per position, kept in the
+    order they were opened), so marking and the exit rules run over every
+    position in one vectorized pass per price snapshot instead of a Python loop.
+    Side is +1 for LONG and -1 for SHORT, so PnL is one formula for both.
+    Reading book[ticker] still gives the old position dict
+    (type, shares, entry, time, max_pnl).
+    """
+    def __init__(self, capacity=INITIAL_CAPACITY):
+        self.tickers = []
+        self.index = {}   # ticker -> slot
+        self.side = np.zeros(capacity)
+        self.shares = np.zeros(capacity)
+        self.entry = np.zeros(capacity)
+        self.opened = np.zeros(capacity)   # Epoch seconds
+        self.max_pnl = np.zeros(capacity)
+
+    def _arrays(self):
+        return (self.side, self.shares, self.entry, self.opened, self.max_pnl)
+
+    def __len__(self):
+        return len(self.tickers)
+
+    def __iter__(self):
+        return iter(list(self.tickers))
+
+    def __contains__(self, ticker):
+        return ticker in self.index
+
+    def __getitem__(self, ticker):
+        i = self.index[ticker]
+        return {
+            'type': 'LONG' if self.side[i] > 0 else 'SHORT',
+            'shares': float(self.shares[i]),
+            'entry': float(self.entry[i]),
+            'time': datetime.fromtimestamp(self.opened[i]),
+            'max_pnl': float(self.max_pnl[i]),
+        }
+
+    def open(self, ticker, trade_type, shares, entry, when):
+        """Adds a position (the caller closes any existing one first)."""
+        n = len(self.tickers)
+        if n == len(self.side):
+            self.side, self.shares, self.entry, self.opened, self.max_pnl = (
+                np.concatenate([a, np.zeros(len(a))]) for a in self._arrays())
+        self.side[n] = 1.0 if trade_type == 'LONG' else -1.0
+        self.shares[n] = shares
+        self.entry[n] = entry
+        self.opened[n] = when.timestamp()
+        self.max_pnl[n] = NO_PEAK_YET
+        self.tickers.append(ticker)
+        self.index[ticker] = n
+
+    def close(self, ticker):
+        """Removes a position and returns it as a dict. Later slots shift down to keep the order."""
+        pos = self[ticker]
+        i = self.index.pop(ticker)
+        n = len(self.tickers)
+        for a in self._arrays():
+            a[i:n - 1] = a[i + 1:n]
+        del self.tickers[i]
+        for j in range(i, n - 1):
+            self.index[self.tickers[j]] = j
+        return pos
+
+    def mark(self, quotes):
+        """
+        Prices every position from a {ticker: price} snapshot and raises the
+        peaks. Returns (prices, pnl, pct_change, valid) arrays in slot order;
+        positions without a usable quote have valid=False and are left alone.
+        """
+        n = len(self.tickers)
+        prices = np.array([quotes.get(t) or np.nan for t in self.tickers], dtype=float)
+        valid = prices > 0   # False for NaN too
+        side, shares, entry, max_pnl = self.side[:n], self.shares[:n], self.entry[:n], self.max_pnl[:n]
+
+        pnl = side * (prices - entry) * shares
+        pct_change = side * (prices - entry) / entry
+        np.copyto(max_pnl, pnl, where=valid & (pnl > max_pnl))
+        return prices, pnl, pct_change, valid
+
+    def check_exits(self, quotes, now, rules):
+        """
+        Marks the book and applies every exit rule to every position at once.
+        Returns [(ticker, reason, price, pnl, max_pnl)] for the positions that
+        should close, in slot order. Nothing is closed here.
+        """
+        n = len(self.tickers)
+        if n == 0:
+            return []
+        prices, pnl, pct_change, _ = self.mark(quotes)
+        max_pnl = self.max_pnl[:n]
+
+        # 1. TRAILING STOP  2. HARD STOP LOSS  3. TAKE PROFIT  4. TIME DECAY (only if green)
+        # (NaN prices compare False everywhere, so unquoted positions never exit)
+        trailing = (max_pnl > rules['trailing_activation']) & ((max_pnl - pnl) > max_pnl * rules['trailing_callback'])
+        stop = pct_change < -rules['stop_loss_pct']
+        take = pct_change > rules['take_profit_pct']
+        timed = ((now.timestamp() - self.opened[:n]) > rules['time_stop_minutes'] * 60) & (pnl > rules['min_scalp_profit'])
+
+        exits = []
+        for i in np.flatnonzero(trailing | stop | take | timed):
+            # First matching rule wins, same order as the checks above
+            reason = TRAILING_STOP if trailing[i] else STOP_LOSS if stop[i] else TAKE_PROFIT if take[i] else TIME_EXIT
+            exits.append((self.tickers[i], reason, float(prices[i]), float(pnl[i]), float(max_pnl[i])))
+        return exits
@@ -0,0 +1,122 @@
+import time
+from datetime import datetime
+
+import pandas as pd
+
+# --- CONFIGURATION ---
+PRICE_TTL_SECONDS = 5.0   # A quote younger than this is reused (exits + dashboard share it)
+MIN_VALID_PRICE = 0.01    # SANITY CHECK: Price cannot be zero or negative
+
+def clean(ticker):
+    return ticker.replace('$', '')
+
+class YFinanceSource:
+    """Live quotes: every ticker in one batched yf.download call."""
+    def fetch(self, tickers):
+        import yfinance as yf
+
+        symbols = sorted({clean(t) for t in tickers})
+        if not symbols:
+            return {}
+
+        prices = {}
+        try:
+            data = yf.download(symbols, period="1d", interval="1m", progress=False,
+                               group_by='column', threads=True)
+            if not data.empty:
+                closes = data['Close']
+                if isinstance(closes, pd.Series):  # Older yfinance: single ticker -> Series
+                    closes = closes.to_frame(symbols[0])
+                last = closes.ffill().iloc[-1]
+                for symbol in symbols:
+                    if symbol in last.index and pd.notna(last[symbol]):
+                        prices[symbol] = float(last[symbol])
+        except Exception:
+            pass
+
+        # Fallback: anything the batch missed gets a single fast_info lookup
+        for symbol in symbols:
+            if symbol in prices:
+                continue
+            try:
+                prices[symbol] = yf.Ticker(symbol).fast_info.last_price
+            except Exception:
+                continue
+
+        return {t: prices.get(clean(t)) for t in tickers}
+
+class ReplaySource:
+    """
+    Quotes from a local file instead of yfinance (tests, offline runs, backtests).
+    The CSV (or an already loaded DataFrame) needs Timestamp, Ticker and Price
+    (or Close) columns; the quote for a ticker is its last row at or before clock().
+    """
+    def __init__(self, path, clock=datetime.now):
+        df = pd.read_csv(path) if isinstance(path, str) else path.copy()
+        price_col = 'Price' if 'Price' in df.columns else 'Close'
+        df['Timestamp'] = pd.to_datetime(df['Timestamp'])
+        df['Ticker'] = df['Ticker'].astype(str).str.replace('$', '', regex=False)
+        df = df.sort_values('Timestamp')
+
+        self.clock = clock
+        self.series = {
+            ticker: (group['Timestamp'].values, group[price_col].values.astype(float))
+            for ticker, group in df.groupby('Ticker')
+        }
+
+    @classmethod
+    def from_series(cls, series, clock=datetime.now):
+        """Built straight from {ticker: (datetime64 times, prices)} arrays, no copies (parameter sweeps)."""
+        source = cls.__new__(cls)
+        source.clock = clock
+        source.series = series
+        return source
+
+    def last_time(self):
+        ends = [times[-1] for times, _ in self.series.values() if len(times)]
+        return pd.Timestamp(max(ends)) if ends else None
+
+    def fetch(self, tickers):
+        now = pd.Timestamp(self.clock()).to_datetime64()
+        prices = {}
+        for ticker in tickers:
+            times, values = self.series.get(clean(ticker), (None, None))
+            if times is None:
+                prices[ticker] = None
+                continue
+            idx = times.searchsorted(now, side='right') - 1
+            prices[ticker] = float(values[idx]) if idx >= 0 else None
+        return prices
+
+class PriceSnapshot:
+    """
+    One batched quote fetch per tick, shared by everyone who asks within the TTL.
+    `source` is anything with fetch(tickers) -> {ticker: price or None}.
+    `clock` returns seconds (a simulated clock in backtests, so the TTL runs on market time).
+    """
+    def __init__(self, source=None, ttl=PRICE_TTL_SECONDS, clock=time.time):
+        self.source = source or YFinanceSource()
+        self.ttl = ttl
+        self.clock = clock
+        self.quotes = {}  # ticker -> (fetched at, price)
+
+    def snapshot(self, tickers):
+        """Returns {ticker: price} for all tickers (None where no valid price)."""
+        now = self.clock()
+        stale = [t for t in tickers if t not in self.quotes or now - self.quotes[t][0] > self.ttl]
+
+        if stale:
+            try:
+                fetched = self.source.fetch(stale)
+            except Exception:
+                fetched = {}
+            for ticker in stale:
+                price = fetched.get(ticker)
+                if price is None or price <= MIN_VALID_PRICE:
+                    price = None
+                self.quotes[ticker] = (now, price)
+
+        return {t: self.quotes[t][1] for t in tickers}
+
+    def get_price(self, ticker):
+        return self.snapshot([ticker])[ticker]
@@ -1,64 +1,373 @@
-from playwright.sync_api import sync_playwright
-import time
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+import asyncio
 import os
+import time
+from collections import Counter
+from datetime import datetime
 
-class TwitterScraper:
-    def __init__(self, headless=False):
+try:
+    import psutil  # Optional: without it we can only recycle on page errors
+except ImportError:
+    psutil = None
+
+# --- CONFIGURATION ---
+MAX_PAGES = 4   # Tabs in the pool = searches in flight at once
+SEARCH_URL = "https://twitter.com/search?q={query}&src=typed_query&f=live"
+STALL_TIMEOUT_MS = 6000   # Give up on a search once no new tweet shows up for this long
+
+# --- NETWORK DIET (what the headless browser is allowed to download) ---
+BLOCKED_RESOURCE_TYPES = {'image', 'media', 'font'}
+BLOCKED_URL_PATTERNS = (
+    'google-analytics.com', 'googletagmanager.com', 'doubleclick.net',
+    'ads-twitter.com', 'analytics.twitter.com', '/1.1/jot/', '/i/api/1.1/jot',
+)
+# --- MEMORY-AWARE RECYCLING ---
+MEMORY_BUDGET_MB = 1500   # Recycle the context once Chromium's RSS goes past this
+MAX_PAGE_ERRORS = 5       # ...or once this many loads failed / tabs crashed
+
+CAPTURE_TIMELINE_JSON = True           # Read tweets from the search API responses too
+TIMELINE_URL_MARKER = "SearchTimeline" # GraphQL endpoint behind the live search page
+
+# --- EVENT-DRIVEN COLLECTOR (runs inside the page) ---
+# A MutationObserver tags every tweet <article> the first time it appears and
+# queues {id, text, time} for Python to drain. Articles already tagged are never
+# read again, so each poll only costs the tweets that are actually new.
+COLLECTOR_JS = """
+() => {
+    if (window.__saQueue) return;
+    window.__saQueue = [];
+    const harvest = () => {
+        const fresh = document.querySelectorAll("article[data-testid='tweet']:not([data-sa-seen])");
+        for (const article of fresh) {
+            const textNode = article.querySelector("div[data-testid='tweetText']");
+            if (!textNode) continue;  // Not rendered yet, the next mutation will catch it
+            article.setAttribute('data-sa-seen', '1');
+            const link = article.querySelector("a[href*='/status/']");
+            const match = link ? link.getAttribute('href').match(/status\\/(\\d+)/) : null;
+            const stamp = article.querySelector('time');
+            window.__saQueue.push({
+                id: match ? match[1] : null,
+                text: textNode.innerText.replace(/\\n/g, ' '),
+                time: stamp ? stamp.getAttribute('datetime') : null,
+            });
+        }
+    };
+    harvest();
+    new MutationObserver(harvest).observe(document.body, {childList: true, subtree: true});
+}
+"""
+
+def _to_iso(created_at):
+    """Twitter API dates ('Wed Oct 10 20:19:24 +0000 2018') -> ISO, like the DOM <time> tag."""
+    try:
+        return datetime.strptime(created_at, "%a %b %d %H:%M:%S %z %Y").isoformat()
+    except (TypeError, ValueError):
+        return created_at
+
+def parse_timeline_json(data):
+    """
+    Pulls every tweet out of a SearchTimeline GraphQL payload.
+    Tweets are the nodes carrying a 'rest_id' plus a 'legacy' block with 'full_text'.
+    Returns dicts shaped like the DOM collector's: {'id', 'text', 'time'}.
+    """
+    found = []
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            legacy = node.get('legacy')
+            if node.get('rest_id') and isinstance(legacy, dict) and 'full_text' in legacy:
+                found.append({
+                    'id': str(node['rest_id']),
+                    'text': legacy['full_text'].replace('\n', ' '),
+                    'time': _to_iso(legacy.get('created_at')),
+                })
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(node)
+    return found
+
+def chromium_rss_mb():
+    """
+    Resident memory of every Chromium process under us (the Playwright driver
+    launches Chrome, so it's a grandchild). None if psutil isn't installed.
+    """
+    if psutil is None:
+        return None
+    total = 0
+    for proc in psutil.Process(os.getpid()).children(recursive=True):
+        try:
+            if 'chrom' in proc.name().lower():
+                total += proc.memory_info().rss
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    return total / (1024 * 1024)
+
+class AsyncTwitterScraper:
+    """
+    One browser, one logged-in context, a bounded pool of tabs.
+    Each search borrows a tab from the pool, so up to `max_pages`
+    ticker searches load in parallel.
+    """
+    def __init__(self, headless=False, max_pages=MAX_PAGES):
         # Check if the ticket exists before starting
         if not os.path.exists("state.json"):
             raise Exception("No state.json found! Run login_setup.py first.")
 
-        self.p = sync_playwright().start()
-        
-        # We launch Chrome. 
-        self.browser = self.p.chromium.launch(
-            headless=headless, 
+        self.headless = headless
+        self.max_pages = max_pages
+        self.p = None
+        self.browser = None
+        self.context = None
+        self.pages = None  # Queue of idle tabs
+        self.captured = {} # page -> tweets parsed from its API responses
+
+        # Network stats
+        self.requests_allowed = 0
+        self.blocked = Counter()   # resource type (or 'tracker') -> requests aborted
+        self.json_responses = 0
+        self.json_tweets = 0
+        self.parse_seconds = 0.0
+
+        # Health stats
+        self.page_errors = 0
+        self.recycles = 0
+        self.restarts = 0
+        self.downtime_seconds = 0.0
+
+    async def start(self):
+        self.p = await async_playwright().start()
+        await self._launch_browser()
+        await self._open_context()
+        print(f"--- Browser Launched (Session Injected, {self.max_pages} tabs) ---")
+        return self
+
+    async def _launch_browser(self):
+        # We launch Chrome.
+        self.browser = await self.p.chromium.launch(
+            headless=self.headless,
             channel="chrome",
             args=["--disable-blink-features=AutomationControlled"]
         )
-        
+
+    async def _open_context(self):
         # INJECT THE COOKIES (The Magic Step)
-        self.context = self.browser.new_context(storage_state="state.json")
-        self.page = self.context.new_page()
-        print("--- Browser Launched (Session Injected) ---")
+        self.context = await self.browser.new_context(storage_state="state.json")
+        await self.context.route("**/*", self._route)
+
+        self.pages = asyncio.Queue()
+        self.captured = {}
+        for _ in range(self.max_pages):
+            page = await self.context.new_page()
+            page.on("crash", lambda page: self._count_error())
+            if CAPTURE_TIMELINE_JSON:
+                self.captured[page] = []
+                page.on("response", lambda response, page=page: self._on_response(page, response))
+            await self.pages.put(page)
+        self.page_errors = 0
+
+    def _count_error(self):
+        self.page_errors += 1
+
+    async def maybe_recycle(self):
+        """
+        Recycles the context (all tabs) if Chromium is over MEMORY_BUDGET_MB or
+        MAX_PAGE_ERRORS piled up. The browser process itself is reused; only if
+        that fails do we relaunch Chrome. Returns a report dict, or None if healthy.
+        """
+        rss = chromium_rss_mb()
+        if rss is not None and rss > MEMORY_BUDGET_MB:
+            reason = f"RSS {rss:.0f}MB > {MEMORY_BUDGET_MB}MB"
+        elif self.page_errors >= MAX_PAGE_ERRORS:
+            reason = f"{self.page_errors} page errors"
+        else:
+            return None
+
+        start = time.time()
+        try:
+            await self.context.close()
+            await self._open_context()
+            self.recycles += 1
+            action = "context recycled"
+        except Exception as e:
+            print(f"   [Error] Context recycle failed ({e}). Relaunching browser...")
+            try:
+                await self.browser.close()
+            except Exception:
+                pass
+            await self._launch_browser()
+            await self._open_context()
+            self.restarts += 1
+            action = "browser relaunched"
+
+        downtime = time.time() - start
+        self.downtime_seconds += downtime
+        return {'reason': reason, 'action': action, 'downtime': downtime,
+                'rss_before': rss, 'rss_after': chromium_rss_mb()}
+
+    async def _route(self, route):
+        """Aborts images/video/fonts and trackers; everything else goes through."""
+        request = route.request
+        if request.resource_type in BLOCKED_RESOURCE_TYPES:
+            self.blocked[request.resource_type] += 1
+            await route.abort()
+        elif any(pattern in request.url for pattern in BLOCKED_URL_PATTERNS):
+            self.blocked['tracker'] += 1
+            await route.abort()
+        else:
+            self.requests_allowed += 1
+            await route.continue_()
 
-    def scrape_search(self, query, max_tweets=10):
+    async def _on_response(self, page, response):
+        """Grabs the search API JSON as it arrives (ids + timestamps, no DOM scraping)."""
+        if TIMELINE_URL_MARKER not in response.url or response.status != 200:
+            return
+        try:
+            data = await response.json()
+        except Exception:
+            return
+        start = time.perf_counter()
+        tweets = parse_timeline_json(data)
+        self.parse_seconds += time.perf_counter() - start
+        self.json_responses += 1
+        self.json_tweets += len(tweets)
+        self.captured[page].extend(tweets)
+
+    def stats(self):
+        blocked = sum(self.blocked.values())
+        total = blocked + self.requests_allowed
+        return {
+            'requests_allowed': self.requests_allowed,
+            'requests_blocked': blocked,
+            'blocked_by_type': dict(self.blocked),
+            'blocked_share': blocked / total if total > 0 else 0.0,
+            'json_responses': self.json_responses,
+            'json_tweets': self.json_tweets,
+            'json_tweets_per_sec': self.json_tweets / self.parse_seconds if self.parse_seconds > 0 else 0.0,
+            'chromium_rss_mb': chromium_rss_mb(),
+            'page_errors': self.page_errors,
+            'recycles': self.recycles,
+            'restarts': self.restarts,
+            'downtime_seconds': self.downtime_seconds,
+        }
+
+    async def scrape_search(self, query, max_tweets=10, records=False):
+        """
+        Returns the tweet texts for a search.
+        With records=True, returns dicts {'id', 'text', 'time'} instead.
+        """
+        page = await self.pages.get()
+        try:
+            tweets = await self._scrape_on_page(page, query, max_tweets)
+        finally:
+            self.pages.put_nowait(page)
+        return tweets if records else [t['text'] for t in tweets]
+
+    async def _scrape_on_page(self, page, query, max_tweets):
         print(f"Searching for: {query}")
-        self.page.goto(f"https://twitter.com/search?q={query}&src=typed_query&f=live")
-        
+        if page in self.captured:
+            self.captured[page].clear()
+        await page.goto(SEARCH_URL.format(query=query))
+
         try:
             # Wait for tweets to appear
-            self.page.wait_for_selector("article[data-testid='tweet']", timeout=20000)
+            await page.wait_for_selector("article[data-testid='tweet']", timeout=20000)
         except:
-            print("Error: Tweets didn't load.")
+            print(f"Error: Tweets didn't load for {query}.")
+            self._count_error()
             return []
-        
+
+        return await self._collect_new_tweets(page, query, max_tweets)
+
+    async def _collect_new_tweets(self, page, query, max_tweets):
+        """
+        Waits for the in-page observer to queue tweets instead of sleeping on a timer.
+        Stops at max_tweets, or once nothing new arrives for STALL_TIMEOUT_MS.
+        """
+        await page.evaluate(COLLECTOR_JS)
+
         tweets_data = []
         unique_tweets = set()
-        
+
         while len(tweets_data) < max_tweets:
-            self.page.keyboard.press("End")
-            time.sleep(2) 
-            
-            elements = self.page.query_selector_all("article[data-testid='tweet']")
-            for tweet in elements:
-                try:
-                    text_node = tweet.query_selector("div[data-testid='tweetText']")
-                    if text_node:
-                        text = text_node.inner_text().replace('\n', ' ')
-                        if text not in unique_tweets:
-                            tweets_data.append(text)
-                            unique_tweets.add(text)
-                            print(f"Found: {text[:50]}...") 
-                except: 
-                    continue
-                
-            if len(tweets_data) >= max_tweets: 
+            try:
+                await page.wait_for_function("window.__saQueue.length > 0", timeout=STALL_TIMEOUT_MS)
+            except PlaywrightTimeoutError:
+                print(f"   [Stall] No new tweets for {query} in {STALL_TIMEOUT_MS/1000:.0f}s. Stopping at {len(tweets_data)}.")
                 break
-                
+
+            # API tweets first: same tweets, but with real ids/timestamps
+            batch = self.captured.get(page, [])[:]
+            if page in self.captured:
+                self.captured[page].clear()
+            batch += await page.evaluate("window.__saQueue.splice(0)")
+            for tweet in batch:
+                key = tweet['id'] or tweet['text']
+                if key not in unique_tweets:
+                    tweets_data.append(tweet)
+                    unique_tweets.add(key)
+                    print(f"Found: {tweet['text'][:50]}...")
+
+            if len(tweets_data) < max_tweets:
+                # Ask the timeline for more; the observer picks up whatever loads
+                await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+
         return tweets_data[:max_tweets]
 
+    async def _polite_scrape(self, query, max_tweets, throttle, records):
+        if throttle:
+            await asyncio.sleep(throttle.reserve('twitter.com'))
+        return await self.scrape_search(query, max_tweets, records)
+
+    async def scrape_many(self, queries, max_tweets=10, throttle=None, records=False):
+        """
+        Runs all searches concurrently across the tab pool.
+        `throttle` (a HostThrottle) staggers the navigations politely.
+        Returns {query: [tweets]}; a query whose scrape crashed maps to None.
+        """
+        results = await asyncio.gather(
+            *(self._polite_scrape(q, max_tweets, throttle, records) for q in queries),
+            return_exceptions=True
+        )
+        output = {}
+        for query, result in zip(queries, results):
+            if isinstance(result, Exception):
+                print(f"   [WARN] Scraper failed for {query}: {result}")
+                self._count_error()
+                output[query] = None
+            else:
+                output[query] = result
+        return output
+
+    async def close(self):
+        await self.browser.close()
+        await self.p.stop()
+        print("--- Browser Closed ---")
+
+class TwitterScraper:
+    """
+    Blocking wrapper around AsyncTwitterScraper for plain (non-async) code.
+    Owns a private event loop, so callers just use normal method calls.
+    """
+    def __init__(self, headless=False, max_pages=1):
+        engine = AsyncTwitterScraper(headless=headless, max_pages=max_pages)
+        self.loop = asyncio.new_event_loop()
+        self.engine = self.loop.run_until_complete(engine.start())
+
+    def scrape_search(self, query, max_tweets=10, records=False):
+        return self.loop.run_until_complete(self.engine.scrape_search(query, max_tweets, records))
+
+    def scrape_many(self, queries, max_tweets=10, throttle=None, records=False):
+        return self.loop.run_until_complete(self.engine.scrape_many(queries, max_tweets, throttle, records))
+
+    def stats(self):
+        return self.engine.stats()
+
+    def maybe_recycle(self):
+        return self.loop.run_until_complete(self.engine.maybe_recycle())
+
     def close(self):
-        self.browser.close()
-        self.p.stop()
-        print("--- Browser Closed ---")
\ No newline at end of file
+        try:
+            self.loop.run_until_complete(self.engine.close())
+        finally:
+            self.loop.close()
@@ -0,0 +1,149 @@
+import hashlib
+import sqlite3
+import time
+from collections import OrderedDict
+from threading import Lock
+
+# --- CONFIGURATION ---
+SENTIMENT_CACHE_FILE = "sentiment_cache.db"
+MEMORY_CACHE_SIZE = 5000     # Hot entries kept in RAM (LRU)
+DISK_CACHE_SIZE = 200000     # Rows kept on disk before the oldest are evicted
+EVICT_FRACTION = 0.10        # Share of the disk store dropped when it overflows
+
+def normalize_text(text):
+    """Collapses whitespace so the same headline always hashes the same."""
+    return " ".join(str(text).split())
+
+def make_key(model_name, text):
+    """Content address: hash of (model, normalized text)."""
+    raw = f"{model_name}\x00{normalize_text(text)}"
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+class SentimentCache:
+    """
+    Two-level score cache: an in-memory LRU in front of a SQLite file.
+    Finviz headlines stay up for hours, so most news scoring becomes a lookup,
+    and the SQLite file means that survives restarts of main.py.
+    """
+    def __init__(self, path=SENTIMENT_CACHE_FILE, memory_size=MEMORY_CACHE_SIZE, disk_size=DISK_CACHE_SIZE):
+        self.path = path
+        self.memory_size = memory_size
+        self.disk_size = disk_size
+        self.memory = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = Lock()
+
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS scores ("
+            " key TEXT PRIMARY KEY, model TEXT, score REAL, last_used REAL)"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS idx_last_used ON scores(last_used)")
+        self.db.commit()
+        self.disk_rows = self.db.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+
+    def _remember(self, key, score):
+        self.memory[key] = score
+        self.memory.move_to_end(key)
+        if len(self.memory) > self.memory_size:
+            self.memory.popitem(last=False)
+
+    def get_many(self, model_name, texts):
+        """
+        Looks up every text. Returns {position: score} for the hits only;
+        anything missing still has to go through the model.
+        """
+        keys = [make_key(model_name, t) for t in texts]
+        found = {}
+        missing = []
+
+        with self._lock:
+            for i, key in enumerate(keys):
+                if key in self.memory:
+                    self.memory.move_to_end(key)
+                    found[i] = self.memory[key]
+                else:
+                    missing.append(i)
+
+            if missing:
+                wanted = list({keys[i] for i in missing})
+                disk = {}
+                # SQLite caps bound parameters, so look up in chunks
+                for start in range(0, len(wanted), 500):
+                    chunk = wanted[start:start + 500]
+                    marks = ",".join("?" * len(chunk))
+                    rows = self.db.execute(f"SELECT key, score FROM scores WHERE key IN ({marks})", chunk)
+                    disk.update(rows.fetchall())
+
+                if disk:
+                    now = time.time()
+                    self.db.executemany("UPDATE scores SET last_used = ? WHERE key = ?",
+                                        [(now, key) for key in disk])
+                    self.db.commit()
+                    for key, score in disk.items():
+                        self._remember(key, score)
+
+                for i in missing:
+                    if keys[i] in disk:
+                        found[i] = disk[keys[i]]
+
+            self.hits += len(found)
+            self.misses += len(texts) - len(found)
+
+        return found
+
+    def put_many(self, model_name, texts, scores):
+        """Stores freshly computed scores in both levels."""
+        if not texts:
+            return
+        now = time.time()
+        rows = [(make_key(model_name, t), model_name, float(s), now) for t, s in zip(texts, scores)]
+
+        with self._lock:
+            for key, _, score, _ in rows:
+                self._remember(key, score)
+            self.db.executemany("INSERT OR REPLACE INTO scores VALUES (?, ?, ?, ?)", rows)
+            self.db.commit()
+            self.disk_rows += len(rows)
+
+            if self.disk_rows > self.disk_size:
+                self._evict()
+
+    def _evict(self):
+        """Drops the least recently used rows once the disk store is over budget."""
+        self.disk_rows = self.db.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+        excess = self.disk_rows - self.disk_size
+        if excess <= 0:
+            return
+        drop = excess + int(self.disk_size * EVICT_FRACTION)
+        self.db.execute(
+            "DELETE FROM scores WHERE key IN (SELECT key FROM scores ORDER BY last_used LIMIT ?)", (drop,)
+        )
+        self.db.commit()
+        self.disk_rows = self.db.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total > 0 else 0.0,
+            'memory_entries': len(self.memory),
+            'disk_entries': self.disk_rows,
+        }
+
+    def close(self):
+        with self._lock:
+            self.db.close()
+
+# Shared instance, opened on first use so scraper-only tools never touch the file
+_shared_cache = None
+_shared_lock = Lock()
+
+def get_shared_cache():
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = SentimentCache()
+    return _shared_cache
@@ -0,0 +1,172 @@
+import json
+import os
+import queue
+import secrets
+import threading
+import time
+from collections import deque
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Listener, Client
+
+# --- CONFIGURATION ---
+BUS_ADDRESS = ('localhost', 6001)
+BUS_KEY_ENV = "SIGNAL_BUS_AUTHKEY"   # Set this to share a key explicitly...
+# ...otherwise one is generated here (mode 0600), next to this file so main.py
+# and paper_trader.py find the same one whatever directory they start from
+BUS_KEY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".signal_bus_key")
+RECONNECT_SECONDS = 5.0   # Publisher waits this long before retrying a dead trader
+MAX_MESSAGE_BYTES = 64 * 1024   # A signal is a few hundred bytes; anything bigger is dropped
+
+def load_authkey(path=BUS_KEY_FILE):
+    """
+    Shared secret for the bus handshake: the env var if set, else the key file,
+    which the first process to need it creates (readable by this user only).
+    """
+    key = os.environ.get(BUS_KEY_ENV)
+    if key:
+        return key.encode('utf-8')
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        pass
+    else:
+        with os.fdopen(fd, 'w') as f:
+            f.write(secrets.token_hex(32))
+    with open(path, 'r') as f:
+        return f.read().strip().encode('utf-8')
+
+def encode_signal(signal):
+    return json.dumps(signal, default=str).encode('utf-8')
+
+def decode_signal(data):
+    """JSON only (never pickle): a bad message can't run code in the trader."""
+    signal = json.loads(data.decode('utf-8'))
+    if not isinstance(signal, dict):
+        raise ValueError("signal must be a JSON object")
+    return signal
+
+class SignalPublisher:
+    """
+    Scanner side (main.py). Pushes each signal straight to the trader the moment
+    it is logged. If the trader can't be reached (not listening, different key),
+    publish() logs it, returns False and backs off; the CSV remains the fallback.
+    """
+    def __init__(self, address=BUS_ADDRESS, authkey=None):
+        self.address = address
+        self.authkey = authkey or load_authkey()
+        self.conn = None
+        self.next_attempt = 0.0
+
+    def publish(self, signal):
+        signal = dict(signal, Published_At=time.time())
+        if self.conn is None:
+            if time.time() < self.next_attempt:
+                return False
+            try:
+                self.conn = Client(self.address, authkey=self.authkey)
+            except (OSError, EOFError):
+                self.next_attempt = time.time() + RECONNECT_SECONDS
+                return False
+            except AuthenticationError:
+                print(f"   [Bus] Trader rejected our key (is {BUS_KEY_ENV} set in only one process?). "
+                      f"Retrying in {RECONNECT_SECONDS:.0f}s.")
+                self.next_attempt = time.time() + RECONNECT_SECONDS
+                return False
+            except Exception as e:
+                print(f"   [Bus] Could not connect to the trader: {e}")
+                self.next_attempt = time.time() + RECONNECT_SECONDS
+                return False
+
+        try:
+            self.conn.send_bytes(encode_signal(signal))
+            return True
+        except Exception:
+            self.close()
+            self.next_attempt = time.time() + RECONNECT_SECONDS
+            return False
+
+    def close(self):
+        if self.conn is not None:
+            try:
+                self.conn.close()
+            except OSError:
+                pass
+            self.conn = None
+
+class SignalSubscriber:
+    """
+    Trader side (paper_trader.py). A background thread accepts publishers and
+    drops every received signal into a queue; the trader blocks on get().
+    """
+    def __init__(self, address=BUS_ADDRESS, authkey=None):
+        self.address = address
+        self.authkey = authkey or load_authkey()
+        self.signals = queue.Queue()
+        self.listener = None
+
+    def start(self):
+        """Returns False if the port is taken (another trader running)."""
+        try:
+            self.listener = Listener(self.address, authkey=self.authkey)
+        except OSError as e:
+            print(f"   [Bus] Could not listen on {self.address}: {e}. Falling back to CSV polling.")
+            return False
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+        print(f"   [Bus] Listening for signals on {self.address[0]}:{self.address[1]}")
+        return True
+
+    def _accept_loop(self):
+        while True:
+            try:
+                conn = self.listener.accept()
+            except AuthenticationError:
+                print(f"   [Bus] Rejected a publisher with the wrong key (is {BUS_KEY_ENV} set in only one process?)")
+                continue
+            except Exception:
+                if self.listener is None:
+                    return  # Closed
+                continue
+            threading.Thread(target=self._read_loop, args=(conn,), daemon=True).start()
+
+    def _read_loop(self, conn):
+        with conn:
+            while True:
+                try:
+                    data = conn.recv_bytes(MAX_MESSAGE_BYTES)
+                except (EOFError, OSError):
+                    return  # Closed, or an oversized message (the connection is dropped)
+                try:
+                    self.signals.put(decode_signal(data))
+                except ValueError as e:
+                    print(f"   [Bus] Dropped malformed signal: {e}")
+
+    def get(self, timeout):
+        """Next signal, or None once `timeout` seconds pass without one."""
+        try:
+            return self.signals.get(timeout=max(0.0, timeout))
+        except queue.Empty:
+            return None
+
+    def close(self):
+        listener, self.listener = self.listener, None
+        if listener is not None:
+            listener.close()
+
+class LatencyTracker:
+    """Rolling signal-to-order latency stats (milliseconds)."""
+    def __init__(self, window=500):
+        self.samples = deque(maxlen=window)
+
+    def record(self, published_at):
+        self.samples.append((time.time() - float(published_at)) * 1000)
+
+    def summary(self):
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return {
+            'count': len(ordered),
+            'avg_ms': sum(ordered) / len(ordered),
+            'p50_ms': ordered[len(ordered) // 2],
+            'max_ms': ordered[-1],
+        }
@@ -0,0 +1,96 @@
+import csv
+import io
+import os
+
+# --- CONFIGURATION ---
+TAIL_CHECK_BYTES = 64   # Bytes before the offset re-read each poll (catches truncate + rewrite in place)
+
+class SignalTailer:
+    """
+    Follows sentiment_signals.csv like `tail -f`.
+    Remembers the byte offset between polls, so each poll only reads what was
+    appended since the last one (O(new rows), nothing is skipped). A half-written
+    last line is held back until its newline arrives. If the file is replaced or
+    truncated (rotation), it starts again from the top of the new file. Truncated
+    and already rewritten past the old offset also counts: the last bytes read
+    are checked against what is on disk now before every read.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.offset = 0
+        self.inode = None
+        self.header = None
+        self.partial = b""
+        self.last_bytes = b""   # The TAIL_CHECK_BYTES just before offset
+
+    def _reset(self, inode):
+        self.offset = 0
+        self.inode = inode
+        self.header = None
+        self.partial = b""
+        self.last_bytes = b""
+
+    def seek_end(self):
+        """Skips everything already in the file (keeps the header for later rows)."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return
+        self._reset(stat.st_ino)
+        with open(self.path, 'rb') as f:
+            first_line = f.readline()
+        if first_line.endswith(b"\n"):
+            self.header = next(csv.reader([first_line.decode('utf-8', errors='replace')]))
+            self.offset = stat.st_size
+            # A half-written last row still has to be picked up once it completes
+            with open(self.path, 'rb') as f:
+                f.seek(max(0, stat.st_size - 4096))
+                tail = f.read()
+            cut = tail.rfind(b"\n") + 1
+            self.partial = tail[cut:]
+            self.last_bytes = tail[-TAIL_CHECK_BYTES:]
+
+    def read_new(self):
+        """Returns the rows appended since the last call, as dicts keyed by the CSV header."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return []
+
+        # ROTATION: a different file now, or the old one got shorter
+        if stat.st_ino != self.inode or stat.st_size < self.offset:
+            self._reset(stat.st_ino)
+
+        if stat.st_size == self.offset:
+            return []
+
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset - len(self.last_bytes))
+            chunk = f.read()
+            if chunk[:len(self.last_bytes)] != self.last_bytes:
+                # Same file, not shorter, but not what we read: rewritten from the top
+                self._reset(stat.st_ino)
+                f.seek(0)
+                chunk = f.read()
+            else:
+                chunk = chunk[len(self.last_bytes):]
+        self.offset += len(chunk)
+        self.last_bytes = (self.last_bytes + chunk)[-TAIL_CHECK_BYTES:]
+
+        data = self.partial + chunk
+        cut = data.rfind(b"\n") + 1
+        self.partial = data[cut:]   # No newline yet: wait for the rest of the line
+        complete = data[:cut]
+        if not complete:
+            return []
+
+        reader = csv.reader(io.StringIO(complete.decode('utf-8', errors='replace')))
+        rows = []
+        for values in reader:
+            if not values:
+                continue
+            if self.header is None:
+                self.header = values
+                continue
+            rows.append(dict(zip(self.header, values)))
+        return rows
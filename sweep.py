@@ -0,0 +1,188 @@
+import argparse
+import itertools
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+import pandas as pd
+
+from backtester import load_signals, load_bars, run_backtest, summarize
+from config_manager import ConfigManager, LEARNING_RULES
+from paper_trader import EXIT_RULES
+
+# --- CONFIGURATION ---
+SWEEP_RESULTS_FILE = "sweep_results.csv"
+SEEDED_KEYS = ("buy_threshold", "sell_threshold", "mode")   # Taken from trading_config.json unless --defaults
+
+# Candidate values per parameter (exit rules from paper_trader, learning rules from config_manager).
+# Grid mode tries every combination; random mode samples between each list's min and max.
+SEARCH_SPACE = {
+    'stop_loss_pct': [0.005, 0.01, 0.02],
+    'take_profit_pct': [0.02, 0.05, 0.08],
+    'time_stop_minutes': [15, 30, 60],
+    'trailing_callback': [0.03, 0.05, 0.10],
+    'reward_win_rate': [0.60, 0.70],
+    'punish_win_rate': [0.40, 0.50],
+    'reward_multiplier': [0.95, 0.98],
+    'punish_multiplier': [1.05, 1.10],
+}
+
+# --- SEARCH ---
+def grid(space=SEARCH_SPACE):
+    keys = list(space)
+    return [dict(zip(keys, values)) for values in itertools.product(*(space[k] for k in keys))]
+
+def random_configs(n, space=SEARCH_SPACE, seed=None):
+    rng = random.Random(seed)
+    configs = []
+    for _ in range(n):
+        params = {}
+        for key, values in space.items():
+            low, high = min(values), max(values)
+            if all(isinstance(v, int) for v in values):
+                params[key] = rng.randint(low, high)
+            else:
+                params[key] = round(rng.uniform(low, high), 4)
+        configs.append(params)
+    return configs
+
+# --- SHARED PRICE DATA ---
+class SharedBars:
+    """
+    All minute bars in two shared-memory blocks (times, closes), sorted by ticker.
+    Workers map the same pages read-only instead of each getting a pickled copy.
+    """
+    def __init__(self, bars):
+        bars = bars[['Timestamp', 'Ticker', 'Close']].dropna()
+        bars = bars.assign(Ticker=bars['Ticker'].astype(str).str.replace('$', '', regex=False),
+                           Timestamp=pd.to_datetime(bars['Timestamp']).astype('datetime64[ns]'))
+        bars = bars.sort_values(['Ticker', 'Timestamp'], kind='stable')
+
+        n = max(len(bars), 1)
+        self.times_shm = shared_memory.SharedMemory(create=True, size=n * 8)
+        self.closes_shm = shared_memory.SharedMemory(create=True, size=n * 8)
+        np.ndarray(len(bars), dtype='int64', buffer=self.times_shm.buf)[:] = bars['Timestamp'].to_numpy().view('int64')
+        np.ndarray(len(bars), dtype='float64', buffer=self.closes_shm.buf)[:] = bars['Close'].to_numpy(dtype='float64')
+
+        # ticker -> (start, stop) row range in the blocks
+        self.layout = {}
+        counts = bars.groupby('Ticker', sort=True).size()
+        start = 0
+        for ticker, count in counts.items():
+            self.layout[ticker] = (start, start + int(count))
+            start += int(count)
+        self.rows = len(bars)
+
+    def handle(self):
+        """What a worker needs to attach (small and picklable)."""
+        return self.times_shm.name, self.closes_shm.name, self.rows, self.layout
+
+    def close(self):
+        for shm in (self.times_shm, self.closes_shm):
+            shm.close()
+            shm.unlink()
+
+# Per-worker state (set once by the pool initializer)
+_worker = {}
+
+def _attach(name):
+    """
+    Maps an existing block without telling the resource tracker about it
+    (only the parent, which created it, owns it). Before 3.13 attaching
+    registers the block like creating it does, and there is no track=False.
+    Registering and then unregistering is not the same: the workers share the
+    parent's tracker, so that would drop the parent's entry too.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+def _init_worker(handle, signals, start_config):
+    times_name, closes_name, rows, layout = handle
+    times_shm = _attach(times_name)
+    closes_shm = _attach(closes_name)
+    times = np.ndarray(rows, dtype='datetime64[ns]', buffer=times_shm.buf)
+    closes = np.ndarray(rows, dtype='float64', buffer=closes_shm.buf)
+    times.flags.writeable = False
+    closes.flags.writeable = False
+
+    _worker['shm'] = (times_shm, closes_shm)  # Keep the mappings alive
+    _worker['series'] = {t: (times[a:b], closes[a:b]) for t, (a, b) in layout.items()}
+    _worker['signals'] = signals
+    _worker['start_config'] = start_config
+
+def _run_one(params):
+    exit_rules = {k: v for k, v in params.items() if k in EXIT_RULES}
+    learning_rules = {k: v for k, v in params.items() if k in LEARNING_RULES}
+    config = ConfigManager(config_file=None, learning_rules=learning_rules, verbose=False)
+    config.config.update(_worker['start_config'])
+
+    trade_log, _ = run_backtest(_worker['signals'], _worker['series'],
+                                exit_rules=exit_rules, config=config)
+    return dict(params, **summarize(trade_log))
+
+def live_start_config():
+    """The thresholds the live bot is running on now (trading_config.json)."""
+    config = ConfigManager(verbose=False).config
+    return {k: config[k] for k in SEEDED_KEYS if k in config}
+
+def run_sweep(signals, bars, configs, workers=None, start_config=None):
+    """
+    Backtests every config on a process pool (all cores by default). Best Sharpe first.
+    bars must already be stamped at bar close (load_bars does this).
+    Every run's adaptive thresholds start from start_config (e.g.
+    live_start_config()), or from the defaults if it's None.
+    """
+    shared = SharedBars(bars)
+    try:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count(), initializer=_init_worker,
+                                 initargs=(shared.handle(), signals, dict(start_config or {}))) as pool:
+            chunksize = max(1, len(configs) // ((workers or os.cpu_count()) * 4))
+            results = list(pool.map(_run_one, configs, chunksize=chunksize))
+    finally:
+        shared.close()
+
+    return pd.DataFrame(results).sort_values('sharpe', ascending=False).reset_index(drop=True)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sweep exit rules and learning rules over replayed backtests.")
+    parser.add_argument("--mode", choices=["grid", "random"], default="grid")
+    parser.add_argument("--samples", type=int, default=200, help="Configs to try in random mode")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--workers", type=int, help="Processes (default: every core)")
+    parser.add_argument("--start", help="First day to replay (YYYY-MM-DD)")
+    parser.add_argument("--end", help="Last day to replay (YYYY-MM-DD)")
+    parser.add_argument("--bars", help="CSV of bars (Timestamp, Ticker, Close); default is the bar store")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--defaults", action="store_true",
+                        help="Start every run from the default thresholds instead of trading_config.json")
+    parser.add_argument("--out", default=SWEEP_RESULTS_FILE)
+    args = parser.parse_args()
+
+    end = pd.Timestamp(args.end) + pd.Timedelta(days=1) if args.end else None
+    signals = load_signals(args.start, end)
+    if signals.empty:
+        print("No signals to replay. Run main.py first!")
+    else:
+        bars = load_bars(signals['Ticker'].unique(), args.bars)
+        configs = grid() if args.mode == "grid" else random_configs(args.samples, seed=args.seed)
+        start_config = None if args.defaults else live_start_config()
+        print(f"Sweeping {len(configs)} configs over {len(signals)} signals "
+              f"on {args.workers or os.cpu_count()} processes (starting from {start_config or 'defaults'})...")
+
+        started = time.time()
+        results = run_sweep(signals, bars, configs, args.workers, start_config)
+        results.to_csv(args.out, index=False)
+
+        print(f"Done in {time.time() - started:.1f}s. Results: {args.out}\n")
+        with pd.option_context('display.width', 200, 'display.max_columns', None):
+            print(results.head(args.top))
@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+
+from backtester import load_bars, run_backtest
+
+def write_minute_bars(path, periods=180):
+    times = pd.date_range("2026-01-05 10:00", periods=periods, freq="1min")
+    # Close of bar k is 100 + k/10, so the price tells us which bar was used
+    pd.DataFrame({'Timestamp': times, 'Ticker': 'TSLA', 'Close': 100.0 + np.arange(periods) / 10}).to_csv(path, index=False)
+
+def signal_at(stamp):
+    return pd.DataFrame({'Timestamp': [pd.Timestamp(stamp)], 'Ticker': ['$TSLA'], 'Signal': ['BUY (Rebellion)'],
+                         'Score': [0.9], 'News_Score': [0.0], 'Diversity': [0.8]})
+
+def test_fill_uses_last_closed_bar(tmp_path):
+    path = tmp_path / "bars.csv"
+    write_minute_bars(path)
+    trade_log, _ = run_backtest(signal_at("2026-01-05 10:10:30"), load_bars(['TSLA'], str(path)))
+
+    opened = trade_log[trade_log['Action'] == 'OPEN_LONG'].iloc[0]
+    # The 10:10 bar is still forming at 10:10:30: the fill is the 10:09 bar's close
+    assert np.isclose(opened['Price'], 100.9)
+
+def test_exit_quotes_never_come_from_forming_bars(tmp_path):
+    path = tmp_path / "bars.csv"
+    write_minute_bars(path)
+    trade_log, _ = run_backtest(signal_at("2026-01-05 10:10:30"), load_bars(['TSLA'], str(path)),
+                                exit_rules={'take_profit_pct': 0.001})
+
+    closed = trade_log[trade_log['Action'].str.startswith('CLOSE')].iloc[0]
+    stamp = pd.Timestamp(closed['Timestamp'])
+    # Price at exit is the close of the last bar that ended by then
+    last_closed_bar = (stamp.floor('min') - pd.Timedelta(minutes=1) - pd.Timestamp("2026-01-05 10:00")) // pd.Timedelta(minutes=1)
+    assert np.isclose(closed['Price'], 100.0 + last_closed_bar / 10)
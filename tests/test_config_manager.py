@@ -0,0 +1,91 @@
+import json
+import os
+
+import pytest
+
+from config_manager import ConfigManager, read_setting
+from model_registry import configured_backend
+
+@pytest.fixture
+def config_path(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)   # No trade history here for seed_win_tracker to find
+    return str(tmp_path / "trading_config.json")
+
+def test_save_is_atomic_and_bumps_the_version(config_path):
+    cm = ConfigManager(config_path, verbose=False)
+    first = cm.version
+    cm.save_config(dict(cm.config, buy_threshold=0.6))
+    cm.save_config(dict(cm.config, buy_threshold=0.7))
+
+    with open(config_path) as f:
+        on_disk = json.load(f)
+    assert on_disk['buy_threshold'] == 0.7
+    assert on_disk['version'] == first + 2 == cm.version
+    # Temp files are renamed over the config, never left behind
+    assert os.listdir(os.path.dirname(config_path)) == ["trading_config.json"]
+
+def test_other_process_picks_up_changes(config_path):
+    writer = ConfigManager(config_path, verbose=False)
+    reader = ConfigManager(config_path, verbose=False)
+    assert reader.refresh() is False   # Nothing changed yet
+
+    writer.save_config(dict(writer.config, buy_threshold=0.65, sell_threshold=0.55))
+    assert reader.get_thresholds() == (0.65, 0.55)
+    assert reader.version == writer.version
+
+def test_keeps_the_last_good_config_after_a_parse_error(config_path):
+    writer = ConfigManager(config_path, verbose=False)
+    reader = ConfigManager(config_path, verbose=False)
+    writer.save_config(dict(writer.config, buy_threshold=0.6))
+    assert reader.get_thresholds()[0] == 0.6
+
+    with open(config_path, 'w') as f:
+        f.write('{"buy_threshold": 0.9, "sell_')   # Someone's half-saved hand edit
+    assert reader.refresh() is False
+    assert reader.get_thresholds()[0] == 0.6
+
+def test_backend_is_read_without_creating_the_config(config_path):
+    assert read_setting("sentiment_backend", "torch", config_path) == "torch"
+    assert configured_backend(config_path) == "torch"
+    assert not os.path.exists(config_path)
+
+    with open(config_path, 'w') as f:
+        json.dump({"sentiment_backend": "int8"}, f)
+    assert configured_backend(config_path) == "int8"
+
+    with open(config_path, 'w') as f:
+        json.dump({"sentiment_backend": "tpu"}, f)   # Unknown: back to fp32
+    assert configured_backend(config_path) == "torch"
+
+def test_rolling_win_rate_matches_a_full_recompute():
+    import random
+    from config_manager import RollingWinRate, WIN_RATE_WINDOW
+
+    rng = random.Random(3)
+    tracker = RollingWinRate()
+    pnls = []
+    for _ in range(200):
+        pnl = rng.choice([-50.0, -0.01, 0.0, 0.01, 75.0])   # Break-even counts as a loss
+        tracker.add(pnl)
+        pnls.append(pnl)
+
+        window = pnls[-WIN_RATE_WINDOW:]   # Older trades have been evicted
+        assert len(tracker) == len(window)
+        assert tracker.win_rate == pytest.approx(sum(p > 0 for p in window) / len(window))
+    assert RollingWinRate().win_rate == 0.0
+
+def test_win_tracker_is_seeded_from_the_last_closed_trades(config_path):
+    from config_manager import WIN_RATE_WINDOW
+
+    # 12 closes (plus the opens in between): only the last WIN_RATE_WINDOW count
+    pnls = [10.0] * 4 + [-5.0] * 6 + [3.0, -1.0]
+    with open("trade_log.csv", 'w') as f:
+        f.write("Timestamp,Ticker,Action,Price,Shares,PnL_Realized\n")
+        for i, pnl in enumerate(pnls):
+            f.write(f"2026-01-05 10:{i:02d}:00,TSLA,OPEN_LONG,100,10,0.0\n")
+            f.write(f"2026-01-05 10:{i:02d}:30,TSLA,CLOSE_STOP_LOSS,100,10,{pnl}\n")
+
+    cm = ConfigManager(config_path, verbose=False)
+    window = pnls[-WIN_RATE_WINDOW:]
+    assert len(cm.win_tracker) == WIN_RATE_WINDOW
+    assert cm.win_tracker.win_rate == pytest.approx(sum(p > 0 for p in window) / len(window))
@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+
+from event_study import forward_returns, infer_bar_length
+
+def minute_bars(ticker="TSLA", start="2026-01-05 10:00", periods=120):
+    times = pd.date_range(start, periods=periods, freq="1min")
+    # Close of bar k is 100 + k, so the price tells us which bar was used
+    return pd.DataFrame({'Timestamp': times, 'Ticker': ticker, 'Close': 100.0 + np.arange(periods)})
+
+def test_entry_uses_last_bar_closed_before_signal():
+    bars = minute_bars()
+    signals = pd.DataFrame({'Timestamp': [pd.Timestamp("2026-01-05 10:10:30")], 'Ticker': ['$TSLA'],
+                            'Signal': ['BUY (Rebellion)'], 'Score': [0.9]})
+    events = forward_returns(signals, bars)
+    # The 10:10 bar closes at 10:11, after the signal: entry must be the 10:09 bar (closes 10:10)
+    assert events['Entry_Price'].iloc[0] == 109.0
+
+def test_entry_on_exact_bar_close():
+    bars = minute_bars()
+    signals = pd.DataFrame({'Timestamp': [pd.Timestamp("2026-01-05 10:10:00")], 'Ticker': ['TSLA'],
+                            'Signal': ['BUY'], 'Score': [0.9]})
+    events = forward_returns(signals, bars, horizons=(1, 5))
+    assert events['Entry_Price'].iloc[0] == 109.0
+    # +5m = 10:15, first close printed then is the 10:14 bar's
+    assert np.isclose(events['Ret_5m'].iloc[0], (114.0 - 109.0) / 109.0 * 100)
+
+def test_infer_bar_length():
+    bars = minute_bars()
+    bars['Timestamp'] = pd.date_range("2026-01-05 10:00", periods=len(bars), freq="5min")
+    assert infer_bar_length(bars) == pd.Timedelta(minutes=5)
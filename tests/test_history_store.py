@@ -0,0 +1,105 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from history_store import HistorySink, load_history, part_count
+
+HEADER = ['Timestamp', 'Ticker', 'Signal', 'Score', 'News_Score', 'Diversity']
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def row(when, i):
+    return [when.strftime('%Y-%m-%d %H:%M:%S'), '$TSLA', 'BUY', i / 100, 0.0, 0.5]
+
+def test_part_count_stays_bounded(tmp_path):
+    clock = FakeClock()
+    sink = HistorySink('signals', root=str(tmp_path), flush_seconds=60, max_parts=5, clock=clock)
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+
+    # 200 ledger batches, one every 10s: buffered into ~33 flushes, never more than 5 files
+    for i in range(200):
+        clock.now += 10
+        sink(HEADER, [row(today + timedelta(seconds=i), i)])
+        assert part_count('signals', today.strftime('%Y-%m-%d'), str(tmp_path)) <= 5
+    sink.close()
+
+    assert part_count('signals', today.strftime('%Y-%m-%d'), str(tmp_path)) == 1
+    assert len(load_history('signals', root=str(tmp_path))) == 200
+
+def test_past_day_compacted_on_rollover(tmp_path):
+    clock = FakeClock()
+    sink = HistorySink('signals', root=str(tmp_path), flush_seconds=60, max_parts=100, clock=clock)
+    yesterday = datetime.now() - timedelta(days=1)
+
+    for i in range(10):
+        clock.now += 60
+        sink(HEADER, [row(yesterday, i)])
+
+    assert part_count('signals', yesterday.strftime('%Y-%m-%d'), str(tmp_path)) == 1
+
+def write_day(root, day, n):
+    from history_store import write_frame
+    import pandas as pd
+    write_frame('signals', pd.DataFrame([row(day, i) for i in range(n)], columns=HEADER), root)
+
+def test_half_written_files_are_invisible(tmp_path):
+    root = str(tmp_path)
+    day = datetime(2026, 1, 5, 10)
+    write_day(root, day, 3)
+    # What a writer (or a killed compaction) leaves mid-write: not a valid Parquet file
+    (tmp_path / "signals" / "date=2026-01-05" / ".part-x.parquet.tmp").write_bytes(b"PAR1 half")
+    (tmp_path / "signals" / ".date=2026-01-05.new").mkdir()
+    (tmp_path / "signals" / ".date=2026-01-05.new" / "part-y.parquet").write_bytes(b"PAR1 half")
+
+    assert len(load_history('signals', root=root)) == 3
+
+def test_compaction_killed_between_renames_is_recovered(tmp_path):
+    from history_store import compact
+    root = str(tmp_path)
+    write_day(root, datetime(2026, 1, 5, 10), 2)
+    write_day(root, datetime(2026, 1, 5, 11), 2)
+    compact('signals', root)
+    # Died after moving the old parts aside, before the merged copy went in
+    base = tmp_path / "signals"
+    (base / ".date=2026-01-05.old").mkdir()
+    (base / "date=2026-01-05").rename(base / ".date=2026-01-05.new")
+    write_day(root, datetime(2026, 1, 5, 12), 1)   # Later rows land in a fresh partition
+
+    compact('signals', root)
+    assert sorted(p.name for p in base.iterdir()) == ["date=2026-01-05"]
+    assert part_count('signals', '2026-01-05', root) == 1
+    assert len(load_history('signals', root=root)) == 5
+
+def test_rows_lost_in_the_buffer_are_backfilled_from_the_csv(tmp_path):
+    import csv as csv_module
+    from history_store import backfill_csv, _csv_rows_since
+    root = str(tmp_path)
+    day = datetime(2026, 1, 5, 10)
+    # The CSV has 50 rows; Parquet got the first 29 (the last two of them share a
+    # timestamp with row 29, which was still buffered when the process was killed)
+    stamps = [day + timedelta(seconds=i // 3) for i in range(50)]
+    rows = [row(t, i) for i, t in enumerate(stamps)]
+    csv_path = tmp_path / "sentiment_signals.csv"
+    with open(csv_path, 'w', newline='') as f:
+        writer = csv_module.writer(f)
+        writer.writerow(HEADER)
+        writer.writerows(rows)
+    import pandas as pd
+    from history_store import write_frame
+    write_frame('signals', pd.DataFrame(rows[:29], columns=HEADER), root)
+
+    # Small windows: the tail reader has to grow a few times to reach the mark
+    found, _ = _csv_rows_since(str(csv_path), pd.Timestamp(stamps[28]), window=64)
+    assert list(found['Score']) == [r[3] for r in rows if pd.Timestamp(r[0]) >= pd.Timestamp(stamps[28])]
+
+    assert backfill_csv('signals', str(csv_path), root) == 21
+    assert backfill_csv('signals', str(csv_path), root) == 0   # Nothing left to copy
+    history = load_history('signals', root=root)
+    assert sorted(history['Score']) == sorted(r[3] for r in rows)
@@ -0,0 +1,44 @@
+import csv
+
+from ledger import LedgerWriter
+
+HEADER = ['Timestamp', 'Ticker', 'Action']
+
+def read(path):
+    with open(path, newline='') as f:
+        return list(csv.reader(f))
+
+def test_rows_are_written(tmp_path):
+    path = str(tmp_path / "log.csv")
+    ledger = LedgerWriter(path, HEADER)
+    ledger.append(['2026-01-05 10:00:00', 'TSLA', 'OPEN_LONG'])
+    ledger.close()
+
+    assert read(path) == [HEADER, ['2026-01-05 10:00:00', 'TSLA', 'OPEN_LONG']]
+
+def test_append_falls_back_when_the_writer_thread_is_dead(tmp_path):
+    path = str(tmp_path / "log.csv")
+    ledger = LedgerWriter(path, HEADER, max_queue=1)
+    ledger.close()
+    assert not ledger.thread.is_alive()
+
+    # With a full one-slot queue and no thread, these would block forever
+    for i in range(3):
+        ledger.append(['2026-01-05 10:00:00', f'T{i}', 'OPEN_LONG'])
+
+    assert [row[1] for row in read(path)[1:]] == ['T0', 'T1', 'T2']
+    assert ledger.written == 3
+
+def test_writer_survives_a_failing_mirror(tmp_path):
+    path = str(tmp_path / "log.csv")
+    ledger = LedgerWriter(path, HEADER)
+
+    def broken(header, rows):
+        raise RuntimeError("boom")
+
+    ledger.add_mirror(broken)
+    ledger.append(['2026-01-05 10:00:00', 'TSLA', 'OPEN_LONG'])
+    ledger.append(['2026-01-05 10:01:00', 'TSLA', 'CLOSE_TAKE_PROFIT'])
+    ledger.close()
+
+    assert len(read(path)) == 3
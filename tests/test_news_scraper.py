@@ -0,0 +1,43 @@
+import pytest
+
+import news_scraper
+from http_client import HttpResponse
+
+PAGE = """<html><body><table id="news-table">
+<tr><td>Jan-05-26 09:30AM</td><td><div><a href="https://a.com/2">Tesla beats earnings</a><span>(Reuters)</span></div></td></tr>
+<tr><td>08:00AM</td><td><div><a href="https://b.com/1">Tesla recalls cars</a><span>(Benzinga)</span></div></td></tr>
+</table></body></html>"""
+
+class BrokenModels:
+    def score_key(self, source_type):
+        return "broken"
+
+    def get(self, source_type):
+        def nlp(*args, **kwargs):
+            raise RuntimeError("model crashed")
+        return nlp
+
+@pytest.fixture
+def finviz(monkeypatch):
+    monkeypatch.setattr(news_scraper, "_last_seen", {})
+    monkeypatch.setattr(news_scraper, "_fetch_finviz_page", lambda ticker: HttpResponse("u", 200, PAGE))
+
+def test_headlines_come_back_until_committed(finviz):
+    records, key = news_scraper.get_finviz_news_since("TSLA")
+    assert [r['URL'] for r in records] == ["https://a.com/2", "https://b.com/1"]
+
+    # Caller failed before committing: the same headlines are returned again
+    again, _ = news_scraper.get_finviz_news_since("TSLA")
+    assert len(again) == 2
+
+    news_scraper.mark_news_seen("TSLA", key)
+    assert news_scraper.get_finviz_news_since("TSLA") == ([], None)
+
+def test_scoring_failure_raises_instead_of_zero_scores(finviz, monkeypatch):
+    monkeypatch.setattr(news_scraper, "models", BrokenModels())
+    monkeypatch.setattr(news_scraper, "USE_SENTIMENT_CACHE", False)
+    records, _ = news_scraper.get_finviz_news_since("TSLA")
+    with pytest.raises(RuntimeError):
+        news_scraper.score_news_records(records)
+    # The lenient path (single texts, calculate_metrics) still falls back to 0.0
+    assert news_scraper.get_sentiment_batch(["Tesla beats earnings"]) == [0.0]
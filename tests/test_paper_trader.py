@@ -0,0 +1,63 @@
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from ledger import MemoryLedger
+from paper_trader import PaperTrader, TRADE_LOG_HEADER
+
+class FixedPrices:
+    def fetch(self, tickers):
+        return {t: 100.0 for t in tickers}
+
+def signal(ticker):
+    return {'Timestamp': pd.Timestamp("2026-01-05 10:00:00"), 'Ticker': ticker, 'Signal': 'BUY (Rebellion)',
+            'Score': 0.9, 'News_Score': 0.0, 'Diversity': 0.8}
+
+def test_a_failing_signal_does_not_stop_the_rest(monkeypatch):
+    trader = PaperTrader(price_source=FixedPrices(), ledger=MemoryLedger(TRADE_LOG_HEADER), verbose=False)
+    execute_trade = trader.execute_trade
+
+    def flaky(row):
+        if row['Ticker'] == 'BAD':
+            raise ValueError("bad row")
+        execute_trade(row)
+
+    monkeypatch.setattr(trader, 'execute_trade', flaky)
+    for row in [signal('BAD'), signal('TSLA')]:
+        trader.trade_safely(row)
+
+    assert 'TSLA' in trader.positions
+
+class SlowPrices:
+    """Each download takes 10s of (simulated) time, longer than the snapshot TTL."""
+    def __init__(self, clock):
+        self.clock = clock
+        self.fetches = 0
+
+    def fetch(self, tickers):
+        self.fetches += 1
+        self.clock.now += timedelta(seconds=10)
+        return {t: 100.0 for t in tickers}
+
+class Clock:
+    def __init__(self):
+        self.now = datetime(2026, 1, 5, 10)
+
+    def __call__(self):
+        return self.now
+
+class NoNewRows:
+    def read_new(self):
+        return []
+
+def test_one_download_per_tick_even_when_it_outlasts_the_ttl():
+    clock = Clock()
+    prices = SlowPrices(clock)
+    trader = PaperTrader(price_source=prices, clock=clock, ledger=MemoryLedger(TRADE_LOG_HEADER), verbose=False)
+    trader.signals = NoNewRows()
+    trader.execute_trade(signal('TSLA'))
+    assert 'TSLA' in trader.positions
+
+    prices.fetches = 0
+    trader.tick()   # Exits and the dashboard share one snapshot
+    assert prices.fetches == 1
@@ -0,0 +1,110 @@
+import random
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from paper_trader import EXIT_RULES
+from position_book import PositionBook, NO_PEAK_YET
+
+def reference_exits(positions, quotes, now, rules):
+    """The per-position loop PositionBook replaced (trailing -> stop -> take-profit -> time)."""
+    exits = []
+    for ticker, pos in list(positions.items()):
+        price = quotes.get(ticker)
+        if not price:
+            continue
+        if pos['type'] == 'LONG':
+            pnl = (price - pos['entry']) * pos['shares']
+            pct_change = (price - pos['entry']) / pos['entry']
+        else:
+            pnl = (pos['entry'] - price) * pos['shares']
+            pct_change = (pos['entry'] - price) / pos['entry']
+        if pnl > pos['max_pnl']:
+            pos['max_pnl'] = pnl
+
+        if pos['max_pnl'] > rules['trailing_activation'] and pos['max_pnl'] - pnl > pos['max_pnl'] * rules['trailing_callback']:
+            reason = "TRAILING_STOP"
+        elif pct_change < -rules['stop_loss_pct']:
+            reason = "STOP_LOSS"
+        elif pct_change > rules['take_profit_pct']:
+            reason = "TAKE_PROFIT"
+        elif now - pos['time'] > timedelta(minutes=rules['time_stop_minutes']) and pnl > rules['min_scalp_profit']:
+            reason = "TIME_EXIT"
+        else:
+            continue
+        exits.append((ticker, reason, price, pnl, pos['max_pnl']))
+    return exits
+
+def random_quote(rng, entry, noise):
+    roll = rng.random()
+    if roll < 0.05:
+        return None
+    if roll < 0.08:
+        return float('nan')
+    if roll < 0.10:
+        return 0.0
+    return entry * (1 + rng.gauss(0, noise))
+
+def test_matches_the_per_position_loop():
+    rng = random.Random(7)
+    rules = EXIT_RULES
+    book = PositionBook(capacity=2)   # Starts small so the arrays have to grow
+    reference = {}
+    noise = {}   # Calm tickers live long enough to reach the time stop
+    now = datetime(2026, 1, 5, 9, 30)
+    reasons = set()
+
+    for step in range(400):
+        now += timedelta(seconds=rng.choice([5, 30, 120]))
+
+        # Open a few positions (tickers come back after they close)
+        for _ in range(rng.randint(0, 3)):
+            ticker = f"T{rng.randint(0, 40)}"
+            if ticker in reference:
+                continue
+            side, entry, shares = rng.choice(['LONG', 'SHORT']), rng.uniform(5, 500), rng.uniform(1, 200)
+            book.open(ticker, side, shares, entry, now)
+            reference[ticker] = {'type': side, 'shares': shares, 'entry': entry, 'time': now, 'max_pnl': NO_PEAK_YET}
+            noise[ticker] = rng.choice([0.002, 0.02])
+
+        # Sometimes close one from the middle by hand (a flip), so later slots shift down
+        if len(reference) > 2 and rng.random() < 0.2:
+            ticker = list(reference)[len(reference) // 2]
+            closed = book.close(ticker)
+            expected = reference.pop(ticker)
+            assert closed['type'] == expected['type'] and np.isclose(closed['entry'], expected['entry'])
+
+        # Missing tickers and None / NaN / zero quotes are all "no usable price"
+        quotes = {t: random_quote(rng, p['entry'], noise[t]) for t, p in reference.items() if rng.random() > 0.05}
+        got = book.check_exits(quotes, now, rules)
+        want = reference_exits(reference, quotes, now, rules)
+
+        assert [(t, r) for t, r, *_ in got] == [(t, r) for t, r, *_ in want], step
+        for (_, _, price, pnl, peak), (_, _, price_ref, pnl_ref, peak_ref) in zip(got, want):
+            assert np.allclose([price, pnl, peak], [price_ref, pnl_ref, peak_ref])
+        for ticker, reason, *_ in got:
+            book.close(ticker)
+            reference.pop(ticker)
+            reasons.add(reason)
+
+        # Survivors keep the same state (peaks included) in the same order
+        assert list(book) == list(reference)
+        for ticker, pos in reference.items():
+            assert np.isclose(book[ticker]['max_pnl'], pos['max_pnl'])
+
+    assert reasons == {"TRAILING_STOP", "STOP_LOSS", "TAKE_PROFIT", "TIME_EXIT"}   # Every rule was exercised
+
+def test_close_from_the_middle_reindexes():
+    book = PositionBook()
+    now = datetime(2026, 1, 5, 10)
+    for i, ticker in enumerate(['A', 'B', 'C', 'D']):
+        book.open(ticker, 'LONG' if i % 2 == 0 else 'SHORT', 10.0 + i, 100.0 + i, now)
+
+    book.close('B')
+    assert list(book) == ['A', 'C', 'D'] and 'B' not in book
+    assert book['C'] == {'type': 'LONG', 'shares': 12.0, 'entry': 102.0, 'time': now, 'max_pnl': NO_PEAK_YET}
+    assert book['D']['type'] == 'SHORT' and book['D']['entry'] == 103.0
+
+    # The shifted slots still exit on their own prices: only D (short) is through its stop
+    exits = book.check_exits({'A': 100.0, 'C': 102.0, 'D': 103.0 * 1.5}, now, EXIT_RULES)
+    assert [(t, r) for t, r, *_ in exits] == [('D', 'STOP_LOSS')]
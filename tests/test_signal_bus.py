@@ -0,0 +1,66 @@
+import os
+import pickle
+import socket
+import stat
+from multiprocessing.connection import Client
+
+import signal_bus
+from signal_bus import SignalPublisher, SignalSubscriber, load_authkey, BUS_KEY_ENV, BUS_KEY_FILE
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('localhost', 0))
+        return s.getsockname()[1]
+
+class Boom:
+    def __init__(self, marker):
+        self.marker = marker
+
+    def __reduce__(self):
+        return (os.system, (f"touch {self.marker}",))
+
+def test_key_file_is_private(tmp_path, monkeypatch):
+    monkeypatch.delenv(BUS_KEY_ENV, raising=False)
+    path = tmp_path / "key"
+    key = load_authkey(str(path))
+    assert len(key) == 64
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+    assert load_authkey(str(path)) == key  # Second process reads the same key
+
+def test_round_trip_and_pickles_are_never_loaded(tmp_path):
+    address = ('localhost', free_port())
+    sub = SignalSubscriber(address, authkey=b"k" * 32)
+    assert sub.start()
+    try:
+        pub = SignalPublisher(address, authkey=b"k" * 32)
+        assert pub.publish({'Ticker': '$TSLA', 'Signal': 'BUY (Rebellion)', 'Score': 0.9})
+        signal = sub.get(timeout=5)
+        assert signal['Ticker'] == '$TSLA' and 'Published_At' in signal
+
+        # A pickle on the wire is just malformed JSON: dropped, never executed
+        conn = Client(address, authkey=b"k" * 32)
+        marker = tmp_path / "pwned"
+        conn.send_bytes(pickle.dumps(Boom(marker)))
+        conn.close()
+        assert sub.get(timeout=0.5) is None
+        assert not marker.exists()
+        pub.close()
+    finally:
+        sub.close()
+
+def test_key_mismatch_backs_off_instead_of_raising():
+    address = ('localhost', free_port())
+    sub = SignalSubscriber(address, authkey=b"a" * 32)
+    assert sub.start()
+    try:
+        pub = SignalPublisher(address, authkey=b"b" * 32)
+        assert pub.publish({'Ticker': '$TSLA', 'Signal': 'BUY (Rebellion)', 'Score': 0.9}) is False
+        assert pub.next_attempt > 0   # Backing off, not retrying the handshake on every signal
+        assert pub.publish({'Ticker': '$NVDA', 'Signal': 'BUY (Rebellion)', 'Score': 0.9}) is False
+        assert sub.get(timeout=0.5) is None
+    finally:
+        sub.close()
+
+def test_key_file_does_not_depend_on_the_working_directory():
+    assert os.path.isabs(BUS_KEY_FILE)
+    assert os.path.dirname(BUS_KEY_FILE) == os.path.dirname(os.path.abspath(signal_bus.__file__))
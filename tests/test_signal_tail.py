@@ -0,0 +1,81 @@
+import os
+
+from signal_tail import SignalTailer
+
+HEADER = "Timestamp,Ticker,Signal,Score,News_Score,Diversity\n"
+
+def line(i, ticker="$TSLA"):
+    return f"2026-01-05 10:00:{i:02d},{ticker},BUY (Rebellion),0.{i:02d},0.0,0.8\n"
+
+def append(path, text):
+    with open(path, 'a') as f:
+        f.write(text)
+
+def tickers(rows):
+    return [row['Ticker'] for row in rows]
+
+def test_file_created_after_start(tmp_path):
+    path = str(tmp_path / "signals.csv")
+    tailer = SignalTailer(path)
+    tailer.seek_end()
+    assert tailer.read_new() == []
+
+    append(path, HEADER + line(1))
+    rows = tailer.read_new()
+    assert rows == [{'Timestamp': '2026-01-05 10:00:01', 'Ticker': '$TSLA', 'Signal': 'BUY (Rebellion)',
+                     'Score': '0.01', 'News_Score': '0.0', 'Diversity': '0.8'}]
+
+def test_partial_lines_wait_for_their_newline(tmp_path):
+    path = str(tmp_path / "signals.csv")
+    tailer = SignalTailer(path)
+    text = HEADER + line(1, "$AAA") + line(2, "$BBB")
+    cut = len(HEADER) + len(line(1)) + 7   # Mid-way through the second row
+
+    append(path, HEADER[:10])
+    assert tailer.read_new() == []
+    append(path, text[10:cut])
+    assert tickers(tailer.read_new()) == ["$AAA"]
+    append(path, text[cut:-1])             # Everything but the newline
+    assert tailer.read_new() == []
+    append(path, "\n")
+    assert tickers(tailer.read_new()) == ["$BBB"]
+    assert tailer.read_new() == []
+
+def test_seek_end_skips_history_but_not_a_half_written_row(tmp_path):
+    path = str(tmp_path / "signals.csv")
+    append(path, HEADER + line(1, "$OLD") + line(2, "$NEW")[:12])
+    tailer = SignalTailer(path)
+    tailer.seek_end()
+
+    append(path, line(2, "$NEW")[12:] + line(3, "$MORE"))
+    assert tickers(tailer.read_new()) == ["$NEW", "$MORE"]
+
+def test_rotation_to_a_new_file(tmp_path):
+    path = str(tmp_path / "signals.csv")
+    append(path, HEADER + line(1, "$OLD") + line(2, "$OLD"))
+    tailer = SignalTailer(path)
+    tailer.seek_end()
+
+    rotated = str(tmp_path / "signals.new")
+    append(rotated, HEADER + line(3, "$NEW"))
+    os.replace(rotated, path)
+    assert tickers(tailer.read_new()) == ["$NEW"]
+
+def test_truncate_and_rewrite_in_place(tmp_path):
+    path = str(tmp_path / "signals.csv")
+    append(path, HEADER + line(1, "$OLD") + line(2, "$OLD"))
+    tailer = SignalTailer(path)
+    tailer.seek_end()
+
+    # Shorter than before: caught by the size
+    with open(path, 'w') as f:
+        f.write(HEADER + line(3, "$AAA"))
+    assert tickers(tailer.read_new()) == ["$AAA"]
+
+    # Already longer than before by the next poll: caught by the bytes at the old offset
+    with open(path, 'w') as f:
+        f.write(HEADER + "".join(line(i, f"$R{i}") for i in range(4, 9)))
+    assert tickers(tailer.read_new()) == [f"$R{i}" for i in range(4, 9)]
+
+    append(path, line(9, "$TAIL"))
+    assert tickers(tailer.read_new()) == ["$TAIL"]
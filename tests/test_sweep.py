@@ -0,0 +1,23 @@
+import numpy as np
+import pandas as pd
+
+from backtester import stamp_at_close
+from sweep import run_sweep
+
+PARAMS = {'stop_loss_pct': 0.01, 'take_profit_pct': 0.001, 'time_stop_minutes': 30, 'trailing_callback': 0.05}
+
+def inputs():
+    times = pd.date_range("2026-01-05 10:00", periods=120, freq="1min")
+    bars = stamp_at_close(pd.DataFrame({'Timestamp': times, 'Ticker': 'TSLA', 'Close': 100.0 + np.arange(120) / 10}))
+    signals = pd.DataFrame({'Timestamp': [pd.Timestamp("2026-01-05 10:10:30")], 'Ticker': ['$TSLA'],
+                            'Signal': ['BUY (Rebellion)'], 'Score': [0.6], 'News_Score': [0.0], 'Diversity': [0.8]})
+    return signals, bars
+
+def test_runs_start_from_the_given_thresholds():
+    signals, bars = inputs()
+    from_defaults = run_sweep(signals, bars, [PARAMS], workers=1)
+    from_live = run_sweep(signals, bars, [PARAMS], workers=1, start_config={'buy_threshold': 0.8})
+
+    # 0.6 clears the default 0.5 threshold but not a live 0.8 one
+    assert from_defaults['trades'].iloc[0] == 1
+    assert from_live['trades'].iloc[0] == 0